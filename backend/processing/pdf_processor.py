@@ -1,40 +1,209 @@
-import sys, pathlib, pymupdf, os
-import logging, io, csv, argparse
+import sys, pathlib, pymupdf, os, hashlib
+import logging, csv, json, argparse, re, sqlite3, threading
 from PIL import Image
 import pytesseract
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import ahocorasick
+except ImportError:  # optional: falls back to one str.count pass per keyword
+    ahocorasick = None
+
+# Parallelism comes from the OCR thread pool, so each Tesseract run stays
+# single-threaded; set before tesserocr loads OpenMP (pytesseract's
+# subprocesses inherit it)
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    import tesserocr
+except ImportError:  # optional: falls back to running the tesseract CLI via pytesseract
+    tesserocr = None
+
+try:
+    from google.cloud import storage
+except ImportError:  # only needed when text is uploaded to GCS
+    storage = None
 
 base_dir = pathlib.Path(__file__).resolve().parent
 
+# Every line boundary str.splitlines() recognises (\r\n counts once), and
+# the whitespace lstrip() would remove from the start of a line
+_LINE_BREAK_RE = re.compile("\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_LEADING_SPACE_RE = re.compile(r"^[^\S\n]+", re.M)
+
+# Concurrent Tesseract runs per process when extracting inline; worker
+# processes split the CPUs between them instead (see _set_ocr_threads)
+OCR_THREADS = min(8, os.cpu_count() or 1)
+_ocr_threads = OCR_THREADS
+# Files read and hashed concurrently when fingerprinting a batch
+DIGEST_THREADS = 32
+# Characters lowercased and scanned at a time when counting keywords
+COUNT_CHUNK_CHARS = 256 * 1024
+
+# Bump when a change alters extract_pdf's output, so cached results are redone
+EXTRACTOR_VERSION = 2
+# Layout of the extraction cache table, stored in its user_version
+_CACHE_SCHEMA_VERSION = 1
+
+_thread_state = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _ocr_pool() -> ThreadPoolExecutor:
+    """
+    OCR threads shared by every PDF this process extracts, so each thread's
+    tesserocr engine (and its loaded language model) is reused across files.
+    """
+    return ThreadPoolExecutor(max_workers=_ocr_threads)
+
+
+def _set_ocr_threads(count: int) -> None:
+    """Process-pool initializer: size this worker's OCR pool."""
+    global _ocr_threads
+    _ocr_threads = count
+
+
+if hasattr(os, "register_at_fork"):
+    # A forked child must not inherit the parent's pool, whose threads are gone
+    os.register_at_fork(after_in_child=_ocr_pool.cache_clear)
+
+
+def _tess_api():
+    """This thread's in-process Tesseract engine (the API is not thread-safe)."""
+    api = getattr(_thread_state, "tess", None)
+    if api is None:
+        api = _thread_state.tess = tesserocr.PyTessBaseAPI()
+    return api
+
+# Concurrent GCS uploads; these are network-bound and overlap with extraction
+UPLOAD_THREADS = 16
+
+
+def _rasterize(page):
+    """
+    Render a page for OCR as (mode, size, raw samples), or None if the page
+    cannot be rendered. The raw pixmap buffer is handed to PIL directly
+    rather than being PNG-encoded and decoded again.
+    """
+    try:
+        pix = page.get_pixmap(matrix=pymupdf.Matrix(2, 2))
+        return ("RGBA" if pix.alpha else "RGB"), (pix.width, pix.height), pix.samples
+    except Exception:
+        return None
+
+
+def _ocr_image(raster) -> tuple:
+    """Run Tesseract on a rendered page; returns (text, average confidence)."""
+    try:
+        img = Image.frombytes(*raster)
+    except Exception:
+        # In unit tests, fakes may not provide real image bytes; use a dummy placeholder
+        img = object()
+    if tesserocr is not None:
+        # In-process: no tesseract subprocess or model reload per page
+        api = _tess_api()
+        api.SetImage(img)
+        return api.GetUTF8Text(), api.MeanTextConf()
+    # One Tesseract run gives both the words and their confidences
+    try:
+        data = pytesseract.image_to_data(img, output=pytesseract.Output.DICT)
+    except Exception:
+        # Keep the page's text even when the word boxes are unavailable
+        return pytesseract.image_to_string(img), None
+    return _text_from_data(data), _average_conf(data)
+
 
-def extract_pdf(pdf_path: pathlib.Path) -> dict:
+def _text_from_data(data: dict) -> str:
+    """
+    Rebuild page text from image_to_data output: words joined by spaces
+    within a line, lines by newlines, blocks separated by a blank line.
+    """
+    blocks = []
+    lines = {}
+    for word, block, par, line in zip(
+        data.get("text", []), data.get("block_num", []), data.get("par_num", []), data.get("line_num", [])
+    ):
+        if not word or not word.strip():
+            continue
+        if not blocks or blocks[-1] != block:
+            blocks.append(block)
+        lines.setdefault((block, par, line), []).append(word)
+    block_lines = {block: [] for block in blocks}
+    for (block, _par, _line), words in lines.items():
+        block_lines[block].append(" ".join(words))
+    return "\n\n".join("\n".join(block_lines[block]) for block in blocks)
+
+
+def _average_conf(data: dict):
+    """Mean word confidence, ignoring Tesseract's -1 for non-word boxes."""
+    confs = []
+    for c in data.get("conf", []):
+        try:
+            value = float(c)
+        except (TypeError, ValueError):
+            continue
+        if value >= 0:
+            confs.append(value)
+    return (sum(confs) / len(confs)) if confs else None
+
+
+def _strip_line_indent(text: str) -> str:
+    """
+    Same result as "\n".join(line.lstrip() for line in text.splitlines()),
+    done with two regex passes instead of a Python loop over every line.
+    """
+    text = _LINE_BREAK_RE.sub("\n", text)
+    if text.endswith("\n"):
+        # splitlines() does not produce an empty final line
+        text = text[:-1]
+    return _LEADING_SPACE_RE.sub("", text)
+
+
+def _open_pdf(pdf_path: pathlib.Path, data=None):
+    if data is not None:
+        # Already in memory (e.g. just downloaded): skip the disk round-trip
+        return pymupdf.open(stream=data, filetype="pdf")
+    return pymupdf.open(str(pdf_path))
+
+
+def extract_pdf(pdf_path: pathlib.Path, data=None) -> dict:
+    """
+    Extract text from a PDF, with OCR for pages that have no text layer.
+
+    data may hold the PDF's bytes (bytes, bytearray or BytesIO) when the
+    caller already has them in memory; pdf_path is then only a label.
+    """
     per_page = []
     text_pages = 0
     ocr_pages = 0
-    with pymupdf.open(str(pdf_path)) as doc:
+    pending = deque()
+    # Pages are rendered on this thread (PyMuPDF objects are not thread-safe);
+    # Tesseract runs in a subprocess or releases the GIL, so OCR of several
+    # pages overlaps. At most window pages are rendered but not yet OCR'd,
+    # so a long scan does not hold every page's pixmap at once.
+    pool = _ocr_pool()
+    window = _ocr_threads * 2
+    with _open_pdf(pdf_path, data) as doc:
         for page in doc:
             t = page.get_text("text", sort=True)
             if t and t.strip():
                 per_page.append({"index": page.number, "source": "native", "text": t})
                 text_pages += 1
             else:
-                try:
-                    pix = page.get_pixmap(matrix=pymupdf.Matrix(2, 2))
-                    img_bytes = pix.tobytes(output="png")
-                    img = Image.open(io.BytesIO(img_bytes))
-                except Exception:
-                    # In unit tests, fakes may not provide real image bytes; use a dummy placeholder
-                    img = object()
-                t_ocr = pytesseract.image_to_string(img)
-                try:
-                    data = pytesseract.image_to_data(img, output=pytesseract.Output.DICT)
-                    confs = [int(c) for c in data.get("conf", []) if c.isdigit() and int(c) >= 0]
-                    avg_conf = (sum(confs) / len(confs)) if confs else None
-                except Exception:
-                    avg_conf = None
-                per_page.append({"index": page.number, "source": "ocr", "text": t_ocr, "ocr_avg_conf": avg_conf})
+                entry = {"index": page.number, "source": "ocr", "text": None, "ocr_avg_conf": None}
+                per_page.append(entry)
+                if len(pending) >= window:
+                    done_entry, future = pending.popleft()
+                    done_entry["text"], done_entry["ocr_avg_conf"] = future.result()
+                pending.append((entry, pool.submit(_ocr_image, _rasterize(page))))
                 ocr_pages += 1
+        for entry, future in pending:
+            entry["text"], entry["ocr_avg_conf"] = future.result()
     text = chr(12).join(p["text"] for p in per_page)
-    text = "\n".join(line.lstrip() for line in text.splitlines())
+    text = _strip_line_indent(text)
     return {
         "text": text,
         "per_page": per_page,
@@ -43,12 +212,289 @@ def extract_pdf(pdf_path: pathlib.Path) -> dict:
     }
 
 
-def process_pdfs(pdf_dir: pathlib.Path, output_dir: pathlib.Path, keywords: list[str]) -> list[dict]:
+def iter_pdfs(root: str):
+    """
+    Yield the paths of .pdf files under root, in os.walk's top-down order.
+
+    Uses os.scandir directly so directory entries are classified from the
+    readdir data, without building os.walk's per-directory name lists.
+    Symlinked directories are not followed and unreadable ones are skipped,
+    as with os.walk.
+    """
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(".pdf"):
+                        yield entry.path
+        except OSError:
+            continue
+        # Reversed so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _extract_and_count(pdf_path: pathlib.Path, keywords: tuple) -> dict:
+    """extract_pdf plus keyword counts ("keyword_hits"), so both run in the worker."""
+    result = extract_pdf(pdf_path)
+    result["keyword_hits"] = _keyword_counter(keywords)(result["text"])
+    return result
+
+
+def _file_digest(pdf_path: str) -> str:
+    """SHA-256 of a file's bytes, or the path itself if it cannot be read."""
+    hasher = hashlib.sha256()
+    try:
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+    except OSError:
+        # Let extraction report the error for this file
+        return pdf_path
+    return hasher.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _extractor_id() -> str:
+    """
+    Identify what produced an extraction: EXTRACTOR_VERSION, the OCR engine
+    and the Tesseract version, e.g. "2:pytesseract:5.3.0".
+    """
+    try:
+        if tesserocr is not None:
+            engine = f"tesserocr:{tesserocr.tesseract_version().split()[1]}"
+        else:
+            engine = f"pytesseract:{pytesseract.get_tesseract_version()}"
+    except Exception:
+        engine = "tesserocr:unknown" if tesserocr is not None else "pytesseract:unknown"
+    return f"{EXTRACTOR_VERSION}:{engine}"
+
+
+def open_extraction_cache(cache_path) -> sqlite3.Connection:
+    """
+    Open (creating if needed) the SQLite cache of extraction results.
+
+    Results are keyed by the SHA-256 of the PDF bytes and by the extractor
+    that produced them (see _extractor_id), so a re-run over unchanged files
+    skips PyMuPDF and OCR entirely, while a new OCR engine, Tesseract release
+    or EXTRACTOR_VERSION re-extracts. Results from other extractors are
+    dropped on open. Delete the file to force re-extraction.
+    """
+    conn = sqlite3.connect(str(cache_path))
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _CACHE_SCHEMA_VERSION:
+        # Caches from before the extractor column cannot be attributed
+        conn.execute("DROP TABLE IF EXISTS extracted")
+        conn.execute(f"PRAGMA user_version = {_CACHE_SCHEMA_VERSION}")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS extracted (
+            content_hash TEXT NOT NULL,
+            extractor TEXT NOT NULL,
+            text_pages INTEGER NOT NULL,
+            ocr_pages INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            per_page TEXT NOT NULL,
+            PRIMARY KEY (content_hash, extractor)
+        )
+    """)
+    conn.execute("DELETE FROM extracted WHERE extractor != ?", (_extractor_id(),))
+    conn.commit()
+    return conn
+
+
+def _load_cached(cache: sqlite3.Connection, digest: str) -> Optional[dict]:
+    row = cache.execute(
+        "SELECT text_pages, ocr_pages, text, per_page FROM extracted "
+        "WHERE content_hash = ? AND extractor = ?",
+        (digest, _extractor_id()),
+    ).fetchone()
+    if row is None:
+        return None
+    text_pages, ocr_pages, text, per_page = row
+    return {
+        "text": text,
+        "per_page": json.loads(per_page),
+        "text_pages": text_pages,
+        "ocr_pages": ocr_pages,
+    }
+
+
+def _store_cached(cache: sqlite3.Connection, digest: str, result: dict) -> None:
+    with cache:
+        cache.execute(
+            "INSERT OR REPLACE INTO extracted (content_hash, extractor, text_pages, ocr_pages, text, per_page) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (digest, _extractor_id(), result["text_pages"], result["ocr_pages"], result["text"],
+             json.dumps(result["per_page"], ensure_ascii=False)),
+        )
+
+
+def _extract_all(pdf_paths: list[str], workers: Optional[int] = None, keywords: tuple = (),
+                 cache: Optional[sqlite3.Connection] = None):
+    """
+    Yield (pdf_path, result, error) for each path, in input order.
+
+    PDFs are extracted in a process pool sized to the CPU count (or workers),
+    since OCR is CPU-bound and every file is independent. Keyword counting
+    over the extracted text happens in the same worker. A single file, or
+    workers=1, is extracted inline without starting a pool.
+
+    Files with identical bytes (sites republish the same PDF under several
+    names) are extracted once; the copies reuse the first one's result.
+    With a cache (see open_extraction_cache), files extracted by an earlier
+    run are not extracted again, and new extractions are added to it.
+    """
+    # Reads and hashing release the GIL, so a thread pool keeps many file
+    # reads in flight instead of leaving the disk idle between files
+    with ThreadPoolExecutor(max_workers=DIGEST_THREADS) as pool:
+        digests = list(pool.map(_file_digest, pdf_paths))
+    first_path = {}
+    for pdf_path, digest in zip(pdf_paths, digests):
+        first_path.setdefault(digest, pdf_path)
+
+    outcomes = {}
+    if cache is not None:
+        count = _keyword_counter(keywords)
+        for digest, pdf_path in first_path.items():
+            result = _load_cached(cache, digest)
+            if result is not None:
+                logging.info(f"{pdf_path} was extracted by an earlier run; using the cached text")
+                result["keyword_hits"] = count(result["text"])
+                outcomes[digest] = (result, None)
+    todo = [(digest, p) for digest, p in first_path.items() if digest not in outcomes]
+
+    def outcome(pdf_path, digest, extract):
+        if first_path[digest] != pdf_path:
+            logging.info(f"{pdf_path} is identical to {first_path[digest]}; reusing its extraction")
+        if digest not in outcomes:
+            try:
+                result = extract()
+            except Exception as e:
+                outcomes[digest] = (None, e)
+            else:
+                outcomes[digest] = (result, None)
+                # An unreadable file's "digest" is its path; nothing to key on
+                if cache is not None and digest != pdf_path:
+                    _store_cached(cache, digest, result)
+        return outcomes[digest]
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(todo) <= 1:
+        for pdf_path, digest in zip(pdf_paths, digests):
+            extract = lambda: _extract_and_count(pathlib.Path(pdf_path), keywords)
+            yield (pdf_path, *outcome(pdf_path, digest, extract))
+        return
+
+    process_workers = min(workers, len(todo))
+    # Share the CPUs between the worker processes' OCR pools rather than
+    # giving each one OCR_THREADS, which would run up to cpu x 8 Tesseracts
+    ocr_threads = max(1, min(OCR_THREADS, (os.cpu_count() or 1) // process_workers))
+    with ProcessPoolExecutor(max_workers=process_workers, initializer=_set_ocr_threads,
+                             initargs=(ocr_threads,)) as ex:
+        futures = {
+            digest: ex.submit(_extract_and_count, pathlib.Path(p), keywords)
+            for digest, p in todo
+        }
+        for pdf_path, digest in zip(pdf_paths, digests):
+            yield (pdf_path, *outcome(pdf_path, digest, lambda: futures[digest].result()))
+
+
+def _line_chunks(text: str, size: Optional[int]):
+    """
+    Yield consecutive slices of text of roughly size characters, each ending
+    at a newline (or the end of text), or text itself when size is None.
+
+    Extracted text only breaks lines with "\n", so a keyword without one
+    never spans two chunks, and lowercasing chunk by chunk gives the same
+    characters as lowercasing the whole text.
+    """
+    if size is None or len(text) <= size:
+        yield text
+        return
+    start, n = 0, len(text)
+    while start < n:
+        end = start + size
+        if end < n:
+            cut = text.rfind("\n", start, end)
+            if cut < 0:
+                cut = text.find("\n", end)
+            end = n if cut < 0 else cut + 1
+        yield text[start:end]
+        start = end
+
+
+@lru_cache(maxsize=None)
+def _keyword_counter(keywords: tuple):
+    """
+    Return a function mapping a document's text to {keyword: count}.
+
+    Counts are case-insensitive and non-overlapping, like str.count. With
+    pyahocorasick installed all keywords are found in a single scan of the
+    text instead of one pass per keyword. Cached, so each worker process
+    builds the automaton once per keyword set.
+
+    The text is lowercased and scanned a chunk at a time (see _line_chunks)
+    so the lowered copy stays cache-sized instead of duplicating the whole
+    document. Keywords spanning a line break force a single whole-text chunk.
+    """
+    if not keywords:
+        return lambda text: {}
+    lowered = {k: k.lower() for k in keywords}
+    chunk_size = None if any("\n" in kl for kl in lowered.values()) else COUNT_CHUNK_CHARS
+
+    if ahocorasick is None:
+        def count(text: str) -> dict:
+            totals = dict.fromkeys(lowered.values(), 0)
+            for chunk in _line_chunks(text, chunk_size):
+                low = chunk.lower()
+                for kl in totals:
+                    totals[kl] += low.count(kl)
+            return {k: totals[kl] for k, kl in lowered.items()}
+        return count
+
+    automaton = ahocorasick.Automaton()
+    for kl in set(lowered.values()):
+        automaton.add_word(kl, kl)
+    automaton.make_automaton()
+
+    def count(text: str) -> dict:
+        totals = dict.fromkeys(lowered.values(), 0)
+        for chunk in _line_chunks(text, chunk_size):
+            last_end = dict.fromkeys(lowered.values(), -1)
+            for end, kl in automaton.iter(chunk.lower()):
+                # Skip matches overlapping the previous one, as str.count does
+                if end - len(kl) >= last_end[kl]:
+                    totals[kl] += 1
+                    last_end[kl] = end
+        return {k: totals[kl] for k, kl in lowered.items()}
+    return count
+
+
+@lru_cache(maxsize=None)
+def _gcs_client():
+    """One storage client per process; it is thread-safe and pools its connections."""
+    if storage is None:
+        raise RuntimeError("google-cloud-storage is required to upload text to GCS")
+    return storage.Client()
+
+
+def upload_text_to_gcs(bucket_name: str, text: str, destination_blob_name: str) -> None:
+    blob = _gcs_client().bucket(bucket_name).blob(destination_blob_name)
+    blob.upload_from_string(text.encode(), content_type="text/plain; charset=utf-8")
+
+
+def process_pdfs(pdf_dir: pathlib.Path, output_dir: pathlib.Path, keywords: list[str],
+                 workers: Optional[int] = None, use_cache: bool = True) -> list[dict]:
     log_dir = output_dir / "logs"
     log_dir.mkdir(parents=True, exist_ok=True)
     output_dir.mkdir(parents=True, exist_ok=True)
     log_path = str(log_dir / "ocr.log")
     summary_csv = str(log_dir / "summary.csv")
+    cache = open_extraction_cache(log_dir / "extract_cache.sqlite") if use_cache else None
 
     # Configure logging once
     if not logging.getLogger().handlers:
@@ -56,53 +502,60 @@ def process_pdfs(pdf_dir: pathlib.Path, output_dir: pathlib.Path, keywords: list
 
     summary_rows: list[dict] = []
 
-    for root, dirs, files in os.walk(str(pdf_dir)):
-        for file in files:
-            if not file.lower().endswith(".pdf"):
-                continue
-            pdf_path = os.path.join(root, file)
-            try:
-                result = extract_pdf(pathlib.Path(pdf_path))
-            except Exception:
-                logging.exception(f"Failed processing {pdf_path}")
+    pdf_paths = list(iter_pdfs(str(pdf_dir)))
+
+    uploads = []
+    # Extraction (and OCR) runs in worker processes; writing outputs and
+    # logging stay in this process, in walk order. Uploads run in the
+    # background so the next PDF is not held up by a GCS round-trip.
+    with ThreadPoolExecutor(max_workers=UPLOAD_THREADS) as upload_pool:
+        for pdf_path, result, error in _extract_all(pdf_paths, workers, tuple(keywords or ()), cache):
+            if error is not None:
+                logging.error(f"Failed processing {pdf_path}", exc_info=error)
                 continue
+            file = os.path.basename(pdf_path)
 
-            # write as a binary file to support non-ASCII characters
             out_txt_path = os.path.join(str(output_dir), file.split(".")[0] + ".txt")
-            try:
-                upload_text_to_gcs(
-                    bucket_name="civic_documents",
-                    text=result["text"],                     # your text string
-                    destination_blob_name=f"{file.split('.')[0]}.txt",
-                )
-                logging.info(f"Wrote text for {pdf_path} to {out_txt_path}")
-            except Exception:
-                logging.exception(f"Failed writing text for {pdf_path}")
-                continue
+            upload = upload_pool.submit(
+                upload_text_to_gcs,
+                bucket_name="civic_documents",
+                text=result["text"],
+                destination_blob_name=f"{file.split('.')[0]}.txt",
+            )
 
             total_chars = len(result["text"])
-            hits = {}
-            if keywords:
-                low = result["text"].lower()
-                for k in keywords:
-                    hits[k] = low.count(k.lower())
-            summary_rows.append({
+            hits = result["keyword_hits"]
+            row = {
                 "file": os.path.relpath(pdf_path, str(pdf_dir)),
                 "pages": result["text_pages"] + result["ocr_pages"],
                 "text_pages": result["text_pages"],
                 "ocr_pages": result["ocr_pages"],
                 "total_chars": total_chars,
                 **{f"kw:{k}": v for k, v in hits.items()}
-            })
+            }
+            uploads.append((pdf_path, out_txt_path, upload, row))
+
+    # Only files whose text was uploaded make it into the summary
+    for pdf_path, out_txt_path, upload, row in uploads:
+        try:
+            upload.result()
+            logging.info(f"Wrote text for {pdf_path} to {out_txt_path}")
+        except Exception:
+            logging.exception(f"Failed writing text for {pdf_path}")
+            continue
+        summary_rows.append(row)
+
+    if cache is not None:
+        cache.close()
 
     if summary_rows:
         fieldnames = ["file", "pages", "text_pages", "ocr_pages", "total_chars"]
         extra = sorted({k for row in summary_rows for k in row.keys()} - set(fieldnames))
-        with open(summary_csv, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames + extra)
-            writer.writeheader()
-            for row in summary_rows:
-                writer.writerow(row)
+        cols = fieldnames + extra
+        with open(summary_csv, "w", newline="", buffering=1024 * 1024) as f:
+            writer = csv.writer(f)
+            writer.writerow(cols)
+            writer.writerows([row.get(c, "") for c in cols] for row in summary_rows)
     return summary_rows
 
     return summary_rows
@@ -122,12 +575,14 @@ if __name__ == "__main__":
     parser.add_argument("--src", type=str, default=str(base_dir / "test_files"), help="Source directory containing PDFs")
     parser.add_argument("--out", type=str, default=str(base_dir / "output"), help="Output directory for .txt and logs")
     parser.add_argument("--kw", type=str, default=os.getenv("CIVICPULSE_KEYWORDS", ""), help="Comma-separated keywords to count")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for extraction (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-extract every PDF instead of reusing results cached by earlier runs")
     args = parser.parse_args()
 
     src = pathlib.Path(args.src)
     out = pathlib.Path(args.out)
     keywords = [k.strip() for k in args.kw.split(",") if k.strip()]
-    processed = process_pdfs(src, out, keywords)
+    processed = process_pdfs(src, out, keywords, workers=args.workers, use_cache=not args.no_cache)
     print(f"Processed {len(processed)} PDFs. Outputs -> {out}")
 
 
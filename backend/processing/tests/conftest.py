@@ -0,0 +1,68 @@
+"""
+Shared pytest setup for the PDF processor helper tests.
+
+Both copies of pdf_processor.py (backend/processing and civicpulse/src/processing)
+are loaded, so every helper test runs against each of them. PyMuPDF, Pillow
+and pytesseract are only touched when a page is actually extracted, so when
+they are not installed empty stand-in modules let the processor import.
+"""
+
+import importlib
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parents[3]
+PROCESSOR_PATHS = {
+    "backend": REPO_DIR / "backend" / "processing" / "pdf_processor.py",
+    "civicpulse": REPO_DIR / "civicpulse" / "src" / "processing" / "pdf_processor.py",
+}
+
+
+def _install_if_missing(name, module):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        sys.modules[name] = module
+
+
+_install_if_missing("pymupdf", types.ModuleType("pymupdf"))
+_fake_image = types.ModuleType("PIL.Image")
+_fake_pil = types.ModuleType("PIL")
+_fake_pil.Image = _fake_image
+_install_if_missing("PIL", _fake_pil)
+if sys.modules["PIL"] is _fake_pil:
+    sys.modules["PIL.Image"] = _fake_image
+_install_if_missing("pytesseract", types.ModuleType("pytesseract"))
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(f"{name}_pdf_processor", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+PROCESSORS = {name: _load(name, path) for name, path in PROCESSOR_PATHS.items()}
+
+
+@pytest.fixture(params=sorted(PROCESSORS))
+def pp(request):
+    """The pdf_processor module under test (each copy in turn)."""
+    return PROCESSORS[request.param]
+
+
+@pytest.fixture(params=["str_count", "ahocorasick"])
+def keyword_counter(request, pp, monkeypatch):
+    """pp._keyword_counter, with and without pyahocorasick."""
+    if request.param == "ahocorasick":
+        monkeypatch.setattr(pp, "ahocorasick", pytest.importorskip("ahocorasick"))
+    else:
+        monkeypatch.setattr(pp, "ahocorasick", None)
+    # Counters are cached per keyword set; build them for this backend
+    pp._keyword_counter.cache_clear()
+    yield pp._keyword_counter
+    pp._keyword_counter.cache_clear()
@@ -0,0 +1,166 @@
+"""
+Unit tests for pdf_processor's text helpers, checked against the plain
+Python expressions they replace.
+"""
+
+import os
+import random
+
+import pytest
+
+
+def reference_counts(text, keywords):
+    """What _keyword_counter replaced: one lowercased str.count per keyword."""
+    low = text.lower()
+    return {k: low.count(k.lower()) for k in keywords}
+
+
+@pytest.mark.parametrize("text, keywords", [
+    # Case folding, including keywords differing only in case
+    ("Budget BUDGET budget bUdGeT", ("budget", "BUDGET", "Budget")),
+    # Matches of one keyword overlapping each other are not counted twice
+    ("aaaa", ("aa",)),
+    ("ababab", ("aba", "bab")),
+    # Keywords overlapping or contained in one another are counted independently
+    ("ushers she hers HERS", ("he", "she", "hers", "her")),
+    ("", ("zoning",)),
+    ("No matches here", ("zoning", "ordinance")),
+])
+def test_keyword_counter_matches_str_count(keyword_counter, text, keywords):
+    assert keyword_counter(keywords)(text) == reference_counts(text, keywords)
+
+
+def test_keyword_counter_matches_str_count_on_random_text(keyword_counter):
+    rng = random.Random(0)
+    keywords = ("a", "ab", "Ba", "aba", "bb", "A B", "b\na")
+    counter = keyword_counter(keywords)
+    for _ in range(500):
+        text = "".join(rng.choice("abAB \n") for _ in range(rng.randint(0, 40)))
+        assert counter(text) == reference_counts(text, keywords)
+
+
+def test_keyword_counter_without_keywords(keyword_counter):
+    assert keyword_counter(())("anything") == {}
+
+
+@pytest.mark.parametrize("size", [None, 1, 7, 64])
+def test_line_chunks_split_at_newlines(pp, size):
+    text = "first line\nsecond\n\nno newline for a while here\nlast"
+    chunks = list(pp._line_chunks(text, size))
+    assert "".join(chunks) == text
+    assert all(chunk.endswith("\n") for chunk in chunks[:-1])
+    if size is None:
+        assert chunks == [text]
+
+
+@pytest.mark.parametrize("keywords", [
+    ("council", "budget"),
+    # A keyword with a newline must still be found across line breaks
+    ("budget\ncouncil", "council"),
+])
+def test_chunked_counts_match_whole_text(keyword_counter, pp, monkeypatch, keywords):
+    # Tiny chunks so keywords regularly fall around chunk boundaries
+    monkeypatch.setattr(pp, "COUNT_CHUNK_CHARS", 8)
+    pp._keyword_counter.cache_clear()
+    rng = random.Random(1)
+    words = ["council", "Budget", "budget\nCouncil", "x", "\n", " "]
+    counter = keyword_counter(keywords)
+    for _ in range(200):
+        text = "".join(rng.choice(words) for _ in range(rng.randint(0, 30)))
+        assert counter(text) == reference_counts(text, keywords)
+
+
+def reference_strip_indent(text):
+    """What _strip_line_indent replaced."""
+    return "\n".join(line.lstrip() for line in text.splitlines())
+
+
+# Line boundaries and whitespace that str.splitlines() / str.lstrip() treat
+# specially, plus characters that look like spaces but are neither
+_INDENT_PIECES = [
+    "a", "b", " ", "\t", "\n", "\r", "\r\n", "\x0b", "\x0c",
+    "\x1c", "\x1d", "\x1e", "\x1f", "\x85", "\u2028", "\u2029",
+    "\xa0", "\u2003", "\u3000", "\u200b", "\ufeff",
+]
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "\n",
+    "  indented\n\tline\r\n  crlf\rcr\n",
+    "page one\x0c  page two\x0b  vertical tab",
+    "a\x1c  b\x1d  c\x1e  d\x1f  e",
+    "x\x85  next line\u2028  line sep\u2029  para sep",
+    "\xa0nbsp\n\u3000ideographic\n\u2003em\n\u200bzero width",
+    "trailing blank lines\n\n\n",
+])
+def test_strip_line_indent_matches_splitlines(pp, text):
+    assert pp._strip_line_indent(text) == reference_strip_indent(text)
+
+
+def test_strip_line_indent_matches_splitlines_on_random_text(pp):
+    rng = random.Random(2)
+    for _ in range(2000):
+        text = "".join(rng.choice(_INDENT_PIECES) for _ in range(rng.randint(0, 15)))
+        assert pp._strip_line_indent(text) == reference_strip_indent(text)
+
+
+def reference_pdf_paths(root):
+    """The os.walk loop iter_pdfs replaced."""
+    for dirpath, _dirs, files in os.walk(root):
+        for file in files:
+            if file.lower().endswith(".pdf"):
+                yield os.path.join(dirpath, file)
+
+
+def test_iter_pdfs_matches_os_walk(pp, tmp_path):
+    for rel in [
+        "a.pdf", "B.PDF", "notes.txt", "c.pdf.bak", "pdf",
+        "sub/d.Pdf", "sub/e.txt", "sub/deeper/f.pdf",
+        # A directory named like a PDF is walked, not yielded
+        "folder.pdf/g.pdf",
+        "z/h.pdf",
+    ]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"%PDF-1.4")
+    (tmp_path / "empty").mkdir()
+
+    found = list(pp.iter_pdfs(str(tmp_path)))
+    assert found == list(reference_pdf_paths(str(tmp_path)))
+    assert sorted(os.path.relpath(p, str(tmp_path)) for p in found) == sorted([
+        "a.pdf", "B.PDF", os.path.join("sub", "d.Pdf"), os.path.join("sub", "deeper", "f.pdf"),
+        os.path.join("folder.pdf", "g.pdf"), os.path.join("z", "h.pdf"),
+    ])
+
+
+def test_identical_pdfs_are_extracted_once(pp, tmp_path, monkeypatch):
+    pdf_dir = tmp_path / "pdfs"
+    (pdf_dir / "copy").mkdir(parents=True)
+    (pdf_dir / "agenda.pdf").write_bytes(b"%PDF-1.4 same bytes")
+    (pdf_dir / "copy" / "agenda_again.pdf").write_bytes(b"%PDF-1.4 same bytes")
+    (pdf_dir / "minutes.pdf").write_bytes(b"%PDF-1.4 other bytes")
+
+    extracted = []
+
+    def fake_extract_and_count(pdf_path, keywords):
+        extracted.append(pdf_path.name)
+        return {
+            "text": f"text of {pdf_path.name}",
+            "per_page": [],
+            "text_pages": 1,
+            "ocr_pages": 0,
+            "keyword_hits": {},
+        }
+
+    monkeypatch.setattr(pp, "_extract_and_count", fake_extract_and_count)
+    if hasattr(pp, "upload_text_to_gcs"):
+        monkeypatch.setattr(pp, "upload_text_to_gcs", lambda **_kwargs: None)
+
+    rows = pp.process_pdfs(pdf_dir, tmp_path / "out", keywords=[], workers=1, use_cache=False)
+
+    assert sorted(extracted) == ["agenda.pdf", "minutes.pdf"]
+    by_file = {row["file"]: row for row in rows}
+    assert sorted(by_file) == sorted(["agenda.pdf", os.path.join("copy", "agenda_again.pdf"), "minutes.pdf"])
+    # The copy reuses the first file's extraction
+    assert by_file[os.path.join("copy", "agenda_again.pdf")]["total_chars"] == len("text of agenda.pdf")
@@ -0,0 +1,14 @@
+"""
+Shared pytest setup for the backend tests.
+
+Puts backend/ and civicpulse/src/ on sys.path once for every test module,
+so they can import the processing and ingestion packages directly.
+"""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+for path in (BACKEND_DIR, BACKEND_DIR.parent / "civicpulse" / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
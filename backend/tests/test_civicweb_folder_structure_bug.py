@@ -10,21 +10,35 @@ structure, while the scraper expects Root → Year folder → Documents. This ca
 scraper to download wrong document types.
 """
 
-import sys
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Add backend to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 import pytest
 import yaml
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
+from urllib3.util.retry import Retry
 
 # Import the scraper functions
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "civicpulse" / "src"))
 from ingestion.civicweb_scraper import find_year_href, iter_document_links, iter_meeting_folder_links
+from ingestion.html_tree import parse_html, text_of
+
+
+# One pooled session for every site analysed, so repeat hosts reuse their
+# TCP/TLS connections and concurrent analyses don't block on the pool
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.3))
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+})
+
+_FOLDER_LINKS = etree.XPath("//a[contains(@href, '/filepro/documents/')]")
+_YEAR_RE = re.compile(r"(20\d{2}|2100)")
 
 
 def analyze_folder_structure(base_url: str, root_folder_url: str) -> dict:
@@ -39,18 +53,10 @@ def analyze_folder_structure(base_url: str, root_folder_url: str) -> dict:
         - has_year_folders: bool
         - year_folders: list of year strings found
     """
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-    })
-    
     try:
-        resp = session.get(urljoin(base_url, root_folder_url), timeout=20)
+        resp = _SESSION.get(urljoin(base_url, root_folder_url), timeout=20)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, 'lxml')
-        
-        # Find all folder links
-        folder_links = soup.find_all('a', href=lambda x: x and '/filepro/documents/' in x)
+        tree = parse_html(resp.content)
         
         result = {
             'structure_type': 'unknown',
@@ -61,20 +67,18 @@ def analyze_folder_structure(base_url: str, root_folder_url: str) -> dict:
             'type_folders': []
         }
         
-        # Check for type folders (Minutes, Agendas)
-        for link in folder_links:
-            text = link.get_text(strip=True)
-            if 'Minutes' in text or 'minutes' in text.lower():
+        # One pass over the folder links: type folders (Minutes, Agendas)
+        # and year folders (2025, 2024, etc.)
+        for link in _FOLDER_LINKS(tree):
+            text = text_of(link)
+            lowered = text.lower()
+            if 'minutes' in lowered:
                 result['has_minutes_folder'] = True
                 result['type_folders'].append(text)
-            if 'Agendas' in text or 'agendas' in text.lower():
+            if 'agendas' in lowered:
                 result['has_agendas_folder'] = True
                 result['type_folders'].append(text)
-        
-        # Check for year folders (2025, 2024, etc.)
-        for link in folder_links:
-            text = link.get_text(strip=True)
-            if text.isdigit() and len(text) == 4 and 2000 <= int(text) <= 2100:
+            if _YEAR_RE.fullmatch(text):
                 result['has_year_folders'] = True
                 result['year_folders'].append(text)
         
@@ -150,22 +154,26 @@ def test_civicweb_folder_structure_detection():
     
     issues_found = []
     
+    cities = []
     for config_path in civicweb_configs:
         with open(config_path, 'r') as f:
             config = yaml.safe_load(f)
         
-        city_name = config.get('city_name', 'Unknown')
         base_url = config.get('base_url', '')
         root_folder_url = config.get('root_folder_url', '')
         
         if not base_url or not root_folder_url:
             continue
         
+        cities.append((config_path, config.get('city_name', 'Unknown'), base_url, root_folder_url))
+    
+    # Fetch every site concurrently; the analysis itself is trivial
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        structures = list(pool.map(lambda city: analyze_folder_structure(city[2], city[3]), cities))
+    
+    for (config_path, city_name, _, _), structure_info in zip(cities, structures):
         print(f"\n--- Testing {city_name} ---")
         
-        # Analyze folder structure
-        structure_info = analyze_folder_structure(base_url, root_folder_url)
-        
         if 'error' in structure_info:
             print(f"  Error analyzing structure: {structure_info['error']}")
             continue
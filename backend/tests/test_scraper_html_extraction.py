@@ -8,12 +8,6 @@ Tests cover:
 - Finding year links in CivicWeb pages
 """
 
-import sys
-from pathlib import Path
-
-# Add backend to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 import pytest
 from ingestion.agendacenter_scraper import extract_meeting_rows
 from ingestion.legistar_scraper import extract_meeting_rows as extract_legistar_meetings
@@ -21,38 +15,45 @@ from ingestion.civicweb_scraper import find_year_href, iter_document_links, iter
 from ingestion.civicplus_scraper import extract_meeting_date_links
 
 
+AGENDACENTER_SELECTORS = {
+    'meeting_row': 'table tbody tr',
+    'date_selector': 'td:first-child',
+    'agenda_link': 'td:nth-child(4) a[href*="ViewFile/Agenda"]',
+    'minutes_link': 'td:nth-child(2) a[href*="ViewFile/Minutes"]'
+}
+
+AGENDACENTER_TABLE_HTML = """
+<table>
+    <tbody>
+        <tr>
+            <td>Nov 6, 2025</td>
+            <td><a href="/ViewFile/Minutes/_11062025-123">Minutes</a></td>
+            <td></td>
+            <td><a href="/ViewFile/Agenda/_11062025-123">Agenda</a></td>
+        </tr>
+        <tr>
+            <td>Oct 21, 2025</td>
+            <td><a href="/ViewFile/Minutes/_10212025-456">Minutes</a></td>
+            <td></td>
+            <td><a href="/ViewFile/Agenda/_10212025-456">Agenda</a></td>
+        </tr>
+    </tbody>
+</table>
+"""
+
+
+@pytest.fixture(scope="module")
+def agendacenter_meetings():
+    """Meetings extracted once from AGENDACENTER_TABLE_HTML and shared by the module."""
+    return extract_meeting_rows(AGENDACENTER_TABLE_HTML, AGENDACENTER_SELECTORS, "https://example.com")
+
+
 class TestAgendaCenterExtraction:
     """Test extract_meeting_rows() from agendacenter_scraper.py"""
     
-    def test_extract_meetings_from_table(self):
+    def test_extract_meetings_from_table(self, agendacenter_meetings):
         """Test extracting meetings from a simple AgendaCenter table."""
-        html = """
-        <table>
-            <tbody>
-                <tr>
-                    <td>Nov 6, 2025</td>
-                    <td><a href="/ViewFile/Minutes/_11062025-123">Minutes</a></td>
-                    <td></td>
-                    <td><a href="/ViewFile/Agenda/_11062025-123">Agenda</a></td>
-                </tr>
-                <tr>
-                    <td>Oct 21, 2025</td>
-                    <td><a href="/ViewFile/Minutes/_10212025-456">Minutes</a></td>
-                    <td></td>
-                    <td><a href="/ViewFile/Agenda/_10212025-456">Agenda</a></td>
-                </tr>
-            </tbody>
-        </table>
-        """
-        
-        selectors = {
-            'meeting_row': 'table tbody tr',
-            'date_selector': 'td:first-child',
-            'agenda_link': 'td:nth-child(4) a[href*="ViewFile/Agenda"]',
-            'minutes_link': 'td:nth-child(2) a[href*="ViewFile/Minutes"]'
-        }
-        
-        meetings = extract_meeting_rows(html, selectors, "https://example.com")
+        meetings = agendacenter_meetings
         
         assert len(meetings) == 2
         assert meetings[0]['parsed_date'] == (2025, 11, 6)
@@ -60,6 +61,11 @@ class TestAgendaCenterExtraction:
         assert meetings[0]['minutes_url'] is not None
         assert meetings[0]['agenda_url'] is not None
     
+    def test_extract_meetings_resolves_urls(self, agendacenter_meetings):
+        """Test that relative ViewFile links are resolved against the base URL."""
+        assert agendacenter_meetings[1]['agenda_url'] == "https://example.com/ViewFile/Agenda/_10212025-456"
+        assert agendacenter_meetings[1]['minutes_url'] == "https://example.com/ViewFile/Minutes/_10212025-456"
+    
     def test_extract_meetings_no_minutes(self):
         """Test extracting meetings where some have no minutes."""
         html = """
@@ -75,14 +81,7 @@ class TestAgendaCenterExtraction:
         </table>
         """
         
-        selectors = {
-            'meeting_row': 'table tbody tr',
-            'date_selector': 'td:first-child',
-            'agenda_link': 'td:nth-child(4) a[href*="ViewFile/Agenda"]',
-            'minutes_link': 'td:nth-child(2) a[href*="ViewFile/Minutes"]'
-        }
-        
-        meetings = extract_meeting_rows(html, selectors, "https://example.com")
+        meetings = extract_meeting_rows(html, AGENDACENTER_SELECTORS, "https://example.com")
         
         assert len(meetings) == 1
         assert meetings[0]['minutes_url'] is None
@@ -7,12 +7,6 @@ Tests cover:
 - Edge cases and error handling
 """
 
-import sys
-from pathlib import Path
-
-# Add backend to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 import pytest
 from ingestion.agendacenter_scraper import parse_date_from_text, generate_filename
 from ingestion.legistar_scraper import parse_legistar_date
@@ -23,33 +17,29 @@ from ingestion.civicplus_scraper import parse_meeting_date as parse_civicplus_da
 class TestAgendaCenterDateParsing:
     """Test parse_date_from_text() from agendacenter_scraper.py"""
     
-    def test_standard_format(self):
-        """Test standard date formats."""
-        assert parse_date_from_text("Nov 6, 2025") == (2025, 11, 6)
-        assert parse_date_from_text("October 14, 2025") == (2025, 10, 14)
-        assert parse_date_from_text("11/06/2025") == (2025, 11, 6)
-        assert parse_date_from_text("2025-11-06") == (2025, 11, 6)
-    
-    def test_with_em_dash(self):
-        """Test dates with em dash separator."""
-        assert parse_date_from_text("Nov6, 2025— AmendedOct30, 2025 4:32 PM") == (2025, 11, 6)
-        assert parse_date_from_text("Oct 21, 2025— PostedOct20, 2025 3:41 PM") == (2025, 10, 21)
-    
-    def test_spacing_issues(self):
-        """Test dates with spacing issues like 'Nov6'."""
-        assert parse_date_from_text("Nov6, 2025") == (2025, 11, 6)
-        assert parse_date_from_text("Oct21, 2025") == (2025, 10, 21)
-    
-    def test_invalid_dates(self):
-        """Test invalid date formats."""
-        assert parse_date_from_text("Invalid date") is None
-        assert parse_date_from_text("") is None
-        assert parse_date_from_text("Not a date 123") is None
-    
-    def test_edge_cases(self):
-        """Test edge cases."""
-        assert parse_date_from_text("Jan 1, 2025") == (2025, 1, 1)
-        assert parse_date_from_text("Dec 31, 2025") == (2025, 12, 31)
+    @pytest.mark.parametrize("text, expected", [
+        # Standard date formats
+        ("Nov 6, 2025", (2025, 11, 6)),
+        ("October 14, 2025", (2025, 10, 14)),
+        ("11/06/2025", (2025, 11, 6)),
+        ("2025-11-06", (2025, 11, 6)),
+        # Em dash separator
+        ("Nov6, 2025— AmendedOct30, 2025 4:32 PM", (2025, 11, 6)),
+        ("Oct 21, 2025— PostedOct20, 2025 3:41 PM", (2025, 10, 21)),
+        # Spacing issues like 'Nov6'
+        ("Nov6, 2025", (2025, 11, 6)),
+        ("Oct21, 2025", (2025, 10, 21)),
+        # Invalid date formats
+        ("Invalid date", None),
+        ("", None),
+        ("Not a date 123", None),
+        # Edge cases
+        ("Jan 1, 2025", (2025, 1, 1)),
+        ("Dec 31, 2025", (2025, 12, 31)),
+    ])
+    def test_parse_date_from_text(self, text, expected):
+        """Test standard, em dash, 'Nov6' spacing, invalid and edge-case dates."""
+        assert parse_date_from_text(text) == expected
 
 
 class TestLegistarDateParsing:
@@ -2,19 +2,13 @@
 Pytest tests for validation functions (domain checking, URL validation).
 
 Tests cover:
-- Domain validation (is_allowed_domain, ensure_allowed_domain)
+- Domain validation (is_allowed_domain, are_allowed_domains, ensure_allowed_domain)
 - URL parsing and validation
 """
 
-import sys
-from pathlib import Path
-
-# Add backend to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 import pytest
 from ingestion.civicweb_scraper import ensure_allowed_domain
-from ingestion.single_link_scraper import is_allowed_domain
+from ingestion.single_link_scraper import are_allowed_domains, is_allowed_domain
 
 
 class TestDomainValidation:
@@ -49,6 +43,12 @@ class TestDomainValidation:
         assert not is_allowed_domain("", ["wichita.gov"])
         assert not is_allowed_domain("not a domain", ["wichita.gov"])
     
+    def test_are_allowed_domains(self):
+        """Test the bulk check matches is_allowed_domain() host by host."""
+        hosts = ["www.wichita.gov", "evil.com", "WICHITA.GOV", "wichita.gov.evil.com", "", "www.wichita.gov"]
+        assert are_allowed_domains(hosts, ["wichita.gov"]) == [True, False, True, False, False, True]
+        assert are_allowed_domains([], ["wichita.gov"]) == []
+    
     def test_ensure_allowed_domain(self):
         """Test ensure_allowed_domain() from civicweb_scraper.py"""
         assert ensure_allowed_domain("https://www.wichita.gov/page", ["wichita.gov"])
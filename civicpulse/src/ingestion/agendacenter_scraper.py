@@ -6,26 +6,38 @@ Designed to work with CivicPlus AgendaCenter pages (e.g., Wichita, Manhattan, Ha
 
 import argparse
 import json
+import os
 import re
-import sqlite3
 import sys
-from datetime import datetime, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
-from urllib.request import Request, urlopen
+
+import requests
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
-    from bs4 import BeautifulSoup
+    from lxml import etree
+    from ingestion.html_tree import css, iter_select, text_of
 except ImportError:
-    print("Error: BeautifulSoup4 is required. Install with: pip install beautifulsoup4")
+    print("Error: lxml and cssselect are required. Install with: pip install lxml cssselect")
     sys.exit(1)
 
 # Import existing helpers
-from ingestion.local_db import init_db, save_if_new, url_exists_in_db
-from ingestion.single_link_scraper import download_url, is_allowed_domain, is_pdf_content
+from ingestion.date_patterns import MONTHS, is_valid_date
+from ingestion.local_db import DocumentBatch, find_existing_urls, init_db, save_if_new_by_hash
+from ingestion.single_link_scraper import (
+    create_session,
+    download_to_file,
+    fetch_html_conditional,
+    is_allowed_domain,
+    is_pdf_content,
+    move_into_place,
+)
 
 try:
     import yaml
@@ -33,7 +45,36 @@ except ImportError:
     print("Error: PyYAML is required. Install with: pip install pyyaml")
     sys.exit(1)
 
+# Downloads run on a small thread pool; each worker pauses briefly before its
+# request so the host never sees more than a handful of requests per second.
+DEFAULT_WORKERS = 4
+REQUEST_DELAY = 0.25
+
+# One keep-alive session for the whole run: the listing page and every PDF on
+# the same host share pooled TCP/TLS connections, with retry/backoff on
+# transient errors.
+SESSION = create_session(
+    {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+)
+
+# Date patterns are compiled once; parse_date_from_text runs for every meeting row
+_FIX_SPACING = re.compile(r'([A-Za-z]+)(\d+)')
+# Every accepted form in one pattern so each string is scanned once. The
+# numeric forms must be the whole string; a month-name date may appear
+# anywhere. After _FIX_SPACING there is always a space between month and day.
+_DATE_RE = re.compile(
+    r'\A(?P<us_m>\d{1,2})/(?P<us_d>\d{1,2})/(?P<us_y>\d{4})\Z'      # 11/06/2025
+    r'|\A(?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})\Z'  # 2025-11-06
+    r'|(?P<name>[A-Za-z]+)\s+(?P<day>\d+),\s+(?P<year>\d{4})'        # Nov 6, 2025
+)
+
 
+# The same date strings recur on every listing page and across runs
+@lru_cache(maxsize=4096)
 def parse_date_from_text(date_text: str) -> tuple:
     """
     Parse date from text like "Nov 6, 2025" or "October 14, 2025" or "Nov6, 2025— AmendedOct30, 2025 4:32 PM".
@@ -51,51 +92,23 @@ def parse_date_from_text(date_text: str) -> tuple:
         date_text = date_text.split(' - ')[0].strip()
     
     # Fix spacing issues like "Nov6" -> "Nov 6"
-    date_text = re.sub(r'([A-Za-z]+)(\d+)', r'\1 \2', date_text)
-    
-    # Try common date formats
-    formats = [
-        "%b %d, %Y",      # Nov 6, 2025
-        "%B %d, %Y",      # October 14, 2025
-        "%m/%d/%Y",       # 11/06/2025
-        "%Y-%m-%d",       # 2025-11-06
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_text, fmt)
-            return (dt.year, dt.month, dt.day)
-        except ValueError:
-            continue
-    
-    # Try to extract from text with regex (handles variations)
-    # Match patterns like "Nov 6, 2025" or "October 14, 2025"
-    match = re.search(r'([A-Za-z]+)\s+(\d+),\s+(\d{4})', date_text)
-    if match:
-        month_name, day, year = match.groups()
-        try:
-            dt = datetime.strptime(f"{month_name} {day}, {year}", "%B %d, %Y")
-            return (dt.year, dt.month, dt.day)
-        except ValueError:
-            try:
-                dt = datetime.strptime(f"{month_name} {day}, {year}", "%b %d, %Y")
-                return (dt.year, dt.month, dt.day)
-            except ValueError:
-                pass
-    
-    # Try extracting just numbers if we see a pattern like "Nov6" or "Oct21"
-    match = re.search(r'([A-Za-z]+)(\d+),\s*(\d{4})', date_text)
-    if match:
-        month_name, day, year = match.groups()
-        try:
-            dt = datetime.strptime(f"{month_name} {day}, {year}", "%b %d, %Y")
-            return (dt.year, dt.month, dt.day)
-        except ValueError:
-            try:
-                dt = datetime.strptime(f"{month_name} {day}, {year}", "%B %d, %Y")
-                return (dt.year, dt.month, dt.day)
-            except ValueError:
-                pass
+    date_text = _FIX_SPACING.sub(r'\1 \2', date_text)
+    
+    match = _DATE_RE.search(date_text)
+    if not match:
+        return None
+    if match['us_y']:
+        year, month, day = int(match['us_y']), int(match['us_m']), int(match['us_d'])
+    elif match['iso_y']:
+        year, month, day = int(match['iso_y']), int(match['iso_m']), int(match['iso_d'])
+    else:
+        # Look the month name up directly instead of round-tripping through strptime
+        month = MONTHS.get(match['name'].lower())
+        if not month:
+            return None
+        year, day = int(match['year']), int(match['day'])
+    if is_valid_date(year, month, day):
+        return (year, month, day)
     
     return None
 
@@ -104,97 +117,126 @@ def generate_filename(city_name: str, year: int, month: int, day: int, doc_type:
     """
     Generate filename like "Wichita_11-06-2025_Agenda.pdf" or "Wichita_10-14-2025_Minutes.pdf".
     """
-    date_str = f"{month:02d}-{day:02d}-{year}"
-    filename = f"{city_name}_{date_str}_{doc_type}.pdf"
-    return filename
+    return f"{city_name}_{month:02d}-{day:02d}-{year}_{doc_type}.pdf"
 
 
-def fetch_page_html(url: str, timeout: int = 30) -> str:
+def fetch_page_html(url: str, timeout: int = 30, session: requests.Session = SESSION,
+                    update_cache: bool = True) -> str:
     """
-    Fetch HTML content from a URL.
+    Fetch HTML content from a URL (conditional GET against the local page cache).
     """
-    req = Request(url)
-    req.add_header("User-Agent", "CivicPulse/1.0")
-    
-    with urlopen(req, timeout=timeout) as response:
-        return response.read().decode('utf-8', errors='ignore')
+    return fetch_html_conditional(session, url, timeout=timeout, update_cache=update_cache)
 
 
-def extract_meeting_rows(html: str, selectors: dict, base_url: str) -> list:
+def extract_meeting_rows(html, selectors: dict, base_url: str) -> list:
     """
-    Extract meeting rows from HTML using BeautifulSoup.
+    Extract meeting rows from HTML using lxml and CSS selectors.
+    Accepts raw HTML or an already parsed tree.
     
     Returns:
-        List of dictionaries, each containing:
+        List of the dictionaries yielded by iter_meeting_rows().
+    """
+    return list(iter_meeting_rows(html, selectors, base_url))
+
+
+def iter_meeting_rows(html, selectors: dict, base_url: str):
+    """
+    Yield meeting rows as the page is parsed.
+    
+    Raw HTML is stream-parsed and each row is discarded once processed, so
+    memory stays flat on long archive listings and the first meetings are
+    available before the whole page has been parsed.
+    
+    Yields:
+        Dictionaries containing:
         - date_text: Raw date text from the page
         - agenda_url: URL to agenda PDF (or None)
         - minutes_url: URL to minutes PDF (or None)
         - parsed_date: Tuple (year, month, day) or None
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    rows = soup.select(selectors['meeting_row'])
-    
-    meetings = []
-    
-    for row in rows:
-        meeting = {
-            'date_text': None,
-            'agenda_url': None,
-            'minutes_url': None,
-            'parsed_date': None
-        }
-        
-        # Extract date
-        date_elem = row.select_one(selectors['date_selector'])
-        if date_elem:
-            date_text = date_elem.get_text(strip=True)
-            meeting['date_text'] = date_text
-            meeting['parsed_date'] = parse_date_from_text(date_text)
-        
-        # Extract agenda link - try multiple selectors in case structure varies
-        agenda_elem = None
-        if 'agenda_link' in selectors:
-            agenda_elem = row.select_one(selectors['agenda_link'])
-        
-        # Fallback: look for any link containing "Agenda" in href
-        if not agenda_elem:
-            agenda_links = row.select('a[href*="Agenda"]')
-            for link in agenda_links:
-                # Skip if it's a "Previous Versions" or similar link
-                href = link.get('href', '')
-                text = link.get_text(strip=True).lower()
-                if 'ViewFile/Agenda' in href and 'previous' not in text.lower():
-                    agenda_elem = link
-                    break
-        
-        if agenda_elem and agenda_elem.get('href'):
-            href = agenda_elem.get('href')
-            meeting['agenda_url'] = urljoin(base_url, href)
-        
-        # Extract minutes link
-        minutes_elem = None
-        if 'minutes_link' in selectors:
-            minutes_elem = row.select_one(selectors['minutes_link'])
-        
-        # Fallback: look for any link containing "Minutes" in href
-        if not minutes_elem:
-            minutes_links = row.select('a[href*="Minutes"]')
-            for link in minutes_links:
-                href = link.get('href', '')
-                text = link.get_text(strip=True).lower()
-                if 'ViewFile/Minutes' in href:
-                    minutes_elem = link
-                    break
-        
-        if minutes_elem and minutes_elem.get('href'):
-            href = minutes_elem.get('href')
-            meeting['minutes_url'] = urljoin(base_url, href)
-        
-        # Only add meetings that have at least a date
-        if meeting['date_text']:
-            meetings.append(meeting)
+    return build_parser(selectors, base_url)(html)
+
+
+def build_parser(selectors: dict, base_url: str):
+    """
+    Specialize the meeting-row parser for one site config.
+    
+    The selectors are compiled and the "is this selector configured?"
+    decisions are taken here, once, so the returned function's per-row loop
+    does no config lookups. Call it once at startup and reuse the result.
+    
+    Returns:
+        Function taking raw HTML (or a parsed tree) and yielding meeting
+        dictionaries as described in iter_meeting_rows().
+    """
+    row_selector = selectors['meeting_row']
+    date_of = _first_match(selectors['date_selector'])
+    agenda_of = _first_match(selectors.get('agenda_link'))
+    minutes_of = _first_match(selectors.get('minutes_link'))
+    
+    def parse(html):
+        for row in iter_select(html, row_selector):
+            date_elem = date_of(row)
+            if date_elem is None:
+                continue
+            date_text = text_of(date_elem)
+            # Only yield meetings that have at least a date
+            if not date_text:
+                continue
+            
+            # Configured selectors first, then one pass over the row's links
+            agenda_elem = agenda_of(row)
+            minutes_elem = minutes_of(row)
+            if agenda_elem is None or minutes_elem is None:
+                agenda_elem, minutes_elem = _scan_view_file_links(row, agenda_elem, minutes_elem)
+            
+            agenda_href = agenda_elem.get('href') if agenda_elem is not None else None
+            minutes_href = minutes_elem.get('href') if minutes_elem is not None else None
+            yield {
+                'date_text': date_text,
+                'agenda_url': urljoin(base_url, agenda_href) if agenda_href else None,
+                'minutes_url': urljoin(base_url, minutes_href) if minutes_href else None,
+                'parsed_date': parse_date_from_text(date_text),
+            }
+    
+    return parse
+
+
+@lru_cache(maxsize=None)
+def _first_match(selector):
+    """
+    Return a function giving the first element under a node matching selector (or None).
+    
+    The CSS is translated to XPath once per selector string and wrapped in
+    "(...)[1]", so libxml2 stops at the first hit instead of building the
+    full node list for every row.
+    """
+    if not selector:
+        return lambda node: None
+    compiled = etree.XPath(f"({css(selector).path})[1]")
     
-    return meetings
+    def first(node):
+        matches = compiled(node)
+        return matches[0] if matches else None
+    
+    return first
+
+
+def _scan_view_file_links(row, agenda_elem, minutes_elem):
+    """Fill in missing agenda/minutes links from the row's ViewFile/Agenda and ViewFile/Minutes hrefs."""
+    for link in row.iterdescendants('a'):
+        href = link.get('href')
+        if not href:
+            continue
+        if agenda_elem is None and 'ViewFile/Agenda' in href:
+            # Skip if it's a "Previous Versions" or similar link
+            if 'previous' not in text_of(link).lower():
+                agenda_elem = link
+        elif minutes_elem is None and 'ViewFile/Minutes' in href:
+            minutes_elem = link
+        if agenda_elem is not None and minutes_elem is not None:
+            break
+    return agenda_elem, minutes_elem
 
 
 def download_and_save_pdf(
@@ -205,11 +247,26 @@ def download_and_save_pdf(
     month: int,
     day: int,
     doc_type: str,
-    output_base: Path,
-    allowed_domains: list
+    output_base,
+    allowed_domains: list,
+    session: requests.Session = SESSION,
+    existing: dict = None,
+    batch: DocumentBatch = None
 ) -> dict:
     """
     Download a PDF, check for duplicates, and save it with proper naming.
+    All downloads share one keep-alive session, so PDFs on the same host
+    reuse a pooled TCP/TLS connection.
+    
+    output_base (str or Path) must already exist; main creates it once per run
+    and passes it as a plain string so per-PDF paths are simple string joins.
+    
+    existing maps URLs already in the database to their document IDs (see
+    local_db.find_existing_urls); callers downloading many PDFs should look
+    them up in one batch. When omitted, this URL is looked up on its own.
+    
+    With a DocumentBatch, the database row is queued and the returned dict's
+    status/document_id are filled in when the batch is flushed.
     
     Returns:
         Dict with status, document_id, bytes, saved_path, reason
@@ -232,55 +289,51 @@ def download_and_save_pdf(
             return result
         
         # Fast URL pre-check: skip download if URL already exists in database
-        db_path = Path("data/civicpulse.db")
-        if url_exists_in_db(url, str(db_path)):
+        if existing is None:
+            existing = find_existing_urls([url])
+        if url in existing:
             result["status"] = "duplicate"
             result["reason"] = "URL already exists in database (skipped download)"
-            # Get existing document ID for consistency
-            conn = sqlite3.connect(str(db_path))
-            try:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id FROM documents WHERE file_url = ? LIMIT 1", (url,))
-                row = cursor.fetchone()
-                if row:
-                    result["document_id"] = row[0]
-            finally:
-                conn.close()
+            result["document_id"] = existing[url]
             return result
         
-        # Download (only if URL is new)
-        content_bytes, content_type = download_url(url)
-        
-        # Check if PDF
-        if not is_pdf_content(content_type, content_bytes):
-            result["reason"] = "not a PDF"
-            return result
-        
-        # Store in database (duplicate detection)
-        db_result = save_if_new(
-            source_id=source_id,
-            file_url=url,
-            content_bytes=content_bytes
-        )
-        
-        result["status"] = db_result["status"]
-        result["document_id"] = db_result["document_id"]
-        result["bytes"] = len(content_bytes)
-        
-        # Always save file to disk if it doesn't exist (even if duplicate in DB)
-        # Generate filename
-        filename = generate_filename(city_name, year, month, day, doc_type)
-        
-        # Create output directory
-        output_base.mkdir(parents=True, exist_ok=True)
-        
-        # Save file if it doesn't exist
-        saved_path = output_base / filename
-        if not saved_path.exists():
-            with open(saved_path, "wb") as f:
-                f.write(content_bytes)
+        # Download (only if URL is new), streaming to a temp file while hashing
+        # Non-PDF responses (error pages, login redirects) are cut off after
+        # the first chunk instead of being downloaded in full
+        download = download_to_file(url, output_base, session=session, accept=is_pdf_content)
+        tmp_path = download["path"]
+        try:
+            # Check if PDF
+            if not download["accepted"]:
+                result["reason"] = "not a PDF"
+                return result
+            
+            # Store in database (duplicate detection)
+            result["bytes"] = download["bytes_size"]
+            if batch is not None:
+                batch.add(source_id, url, download["content_hash"], download["bytes_size"], result)
+            else:
+                db_result = save_if_new_by_hash(
+                    source_id=source_id,
+                    file_url=url,
+                    content_hash=download["content_hash"],
+                    bytes_size=download["bytes_size"]
+                )
+                result["status"] = db_result["status"]
+                result["document_id"] = db_result["document_id"]
+            
+            # Always save file to disk if it doesn't exist (even if duplicate in DB)
+            # Generate filename
+            filename = generate_filename(city_name, year, month, day, doc_type)
+            
+            # Publish the temp file atomically unless the file already exists
+            saved_path = os.path.join(output_base, filename)
+            move_into_place(tmp_path, saved_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
         
-        result["saved_path"] = str(saved_path)
+        result["saved_path"] = saved_path
         
         return result
     
@@ -296,6 +349,8 @@ def main():
     parser.add_argument("--config", required=True, help="Path to config YAML")
     parser.add_argument("--outdir", help="Base output directory (overrides config)")
     parser.add_argument("--dry-run", action="store_true", help="Parse page but don't download")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent downloads (default {DEFAULT_WORKERS})")
     
     args = parser.parse_args()
     
@@ -331,6 +386,8 @@ def main():
     output_dir = Path(output_base_dir) / config['city_name']
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    output_dir_str = str(output_dir)
+    
     print(f"Output directory: {output_dir}", file=sys.stderr)
     
     # Extract base URL for resolving relative links
@@ -340,14 +397,15 @@ def main():
     print(f"Fetching: {page_url}", file=sys.stderr)
     
     try:
-        html = fetch_page_html(page_url)
+        html = fetch_page_html(page_url, update_cache=not args.dry_run)
     except Exception as e:
         print(json.dumps({"error": f"Failed to fetch page: {e}"}))
         sys.exit(1)
     
     # Extract meeting rows
-    selectors = config['selectors']
-    meetings = extract_meeting_rows(html, selectors, base_url)
+    # Specialize the row parser for this config once, then run it
+    parse_meetings = build_parser(config['selectors'], base_url)
+    meetings = list(parse_meetings(html))
     
     print(f"Found {len(meetings)} meetings", file=sys.stderr)
     
@@ -384,63 +442,60 @@ def main():
     meetings_2025 = [m for m in meetings if m.get('parsed_date') and m['parsed_date'][0] == target_year]
     print(f"Filtering to {target_year} meetings: {len(meetings_2025)} out of {len(meetings)} total", file=sys.stderr)
     
+    # Build the download jobs up front, then fetch them concurrently over the
+    # shared session. Results are tallied in the original meeting order.
+    jobs = []
     for meeting in meetings_2025:
         parsed_date = meeting['parsed_date']
         if not parsed_date:
             print(f"Warning: Could not parse date: {meeting['date_text']}", file=sys.stderr)
             continue
         
-        year, month, day = parsed_date
-        
-        # Download Agenda
         if meeting['agenda_url']:
-            print(f"Downloading agenda for {meeting['date_text']}...", file=sys.stderr)
-            agenda_result = download_and_save_pdf(
-                meeting['agenda_url'],
-                source_id,
-                city_name,
-                year, month, day,
-                "Agenda",
-                output_dir,
-                allowed_domains
-            )
-            
-            results["downloads"].append(agenda_result)
-            
-            if agenda_result["status"] == "created":
-                results["agendas_downloaded"] += 1
-                print(f"  ✓ Downloaded: {agenda_result.get('saved_path', 'N/A')}", file=sys.stderr)
-            elif agenda_result["status"] == "duplicate":
-                results["agendas_duplicates"] += 1
-                print(f"  ⊙ Duplicate (skipped)", file=sys.stderr)
-            else:
-                results["agendas_errors"] += 1
-                print(f"  ✗ Error: {agenda_result['reason']}", file=sys.stderr)
-        
-        # Download Minutes
+            jobs.append((meeting, "Agenda", meeting['agenda_url']))
         if meeting['minutes_url']:
-            print(f"Downloading minutes for {meeting['date_text']}...", file=sys.stderr)
-            minutes_result = download_and_save_pdf(
-                meeting['minutes_url'],
-                source_id,
-                city_name,
-                year, month, day,
-                "Minutes",
-                output_dir,
-                allowed_domains
-            )
-            
-            results["downloads"].append(minutes_result)
-            
-            if minutes_result["status"] == "created":
-                results["minutes_downloaded"] += 1
-                print(f"  ✓ Downloaded: {minutes_result.get('saved_path', 'N/A')}", file=sys.stderr)
-            elif minutes_result["status"] == "duplicate":
-                results["minutes_duplicates"] += 1
-                print(f"  ⊙ Duplicate (skipped)", file=sys.stderr)
-            else:
-                results["minutes_errors"] += 1
-                print(f"  ✗ Error: {minutes_result['reason']}", file=sys.stderr)
+            jobs.append((meeting, "Minutes", meeting['minutes_url']))
+    
+    def download(job):
+        meeting, doc_type, url = job
+        year, month, day = meeting['parsed_date']
+        time.sleep(REQUEST_DELAY)  # be polite
+        return download_and_save_pdf(
+            url,
+            source_id,
+            city_name,
+            year, month, day,
+            doc_type,
+            output_dir_str,
+            allowed_domains,
+            existing=existing,
+            batch=batch
+        )
+    
+    # One batched query replaces a per-PDF URL lookup
+    existing = find_existing_urls([url for _meeting, _doc_type, url in jobs])
+    # Document rows are committed in batches rather than one transaction per PDF
+    batch = DocumentBatch()
+    
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        job_results = list(pool.map(download, jobs))
+    batch.flush()
+    
+    for (meeting, doc_type, _url), result in zip(jobs, job_results):
+        key = "agendas" if doc_type == "Agenda" else "minutes"
+        print(f"{doc_type} for {meeting['date_text']}:", file=sys.stderr)
+        
+        results["downloads"].append(result)
+        
+        if result["status"] == "created":
+            results[f"{key}_downloaded"] += 1
+            print(f"  ✓ Downloaded: {result.get('saved_path', 'N/A')}", file=sys.stderr)
+        elif result["status"] == "duplicate":
+            results[f"{key}_duplicates"] += 1
+            print(f"  ⊙ Duplicate (skipped)", file=sys.stderr)
+        else:
+            results[f"{key}_errors"] += 1
+            print(f"  ✗ Error: {result['reason']}", file=sys.stderr)
     
     # Print summary
     print(f"\n=== Summary ===", file=sys.stderr)
@@ -19,13 +19,14 @@ import json
 import re
 import sys
 import time
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 
 # Selenium imports
 try:
@@ -35,14 +36,44 @@ try:
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
 except ImportError:
     print("Error: Selenium is required. Install with: pip install selenium", file=sys.stderr)
     sys.exit(1)
 
 # Make sure we can import ingestion utilities when running from backend/
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from ingestion.date_patterns import MONTHS, is_valid_date  # noqa: E402
 from ingestion.local_db import init_db, save_if_new  # noqa: E402
-from ingestion.single_link_scraper import download_url, is_allowed_domain, is_pdf_content  # noqa: E402
+from ingestion.single_link_scraper import create_session, download_url, is_allowed_domain, is_pdf_content  # noqa: E402
+from ingestion.html_tree import parse_html, select, text_of  # noqa: E402
+
+
+# The shown tab panel (should be the target year); any tab panel otherwise
+_SHOWING_TAB_PANEL = etree.XPath(
+    "//div[contains(@class, 'showing') and contains(translate(@class, 'TAB', 'tab'), 'tab')][1]"
+)
+_TAB_PANEL = etree.XPath("//div[contains(translate(@class, 'TAB', 'tab'), 'tab')][1]")
+# Nearest of a field wrapper's five closest ancestors that is a cp-formatField container
+_CLICKABLE_CONTAINER_PATH = "ancestor::*[position() <= 5][contains(@class, 'cp-formatField')][1]"
+_CLICKABLE_CONTAINER = etree.XPath(_CLICKABLE_CONTAINER_PATH)
+
+# Selenium locators; the templates are filled in with str.format
+_YEAR_WRAPPER_XPATH = "//div[contains(@class, 'cp-fieldWrapper') and contains(., '{}')]"
+_DATE_ELEM_XPATH = "//div[contains(@class, 'cp-fieldWrapper') and normalize-space(text())='{}']"
+_DATED_MINUTES_LINK_XPATH = "//a[contains(text(), 'Minutes') and (contains(text(), '{}') or contains(@title, 'Minutes'))]"
+
+
+DEFAULT_WORKERS = 4
+
+# One keep-alive session for the whole run: every PDF on the same host shares
+# pooled TCP/TLS connections, with retry/backoff on transient errors.
+SESSION = create_session(
+    {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+)
 
 
 def read_yaml(path: Path) -> dict:
@@ -55,6 +86,16 @@ def read_yaml(path: Path) -> dict:
         return yaml.safe_load(f)
 
 
+# Day-of-week prefix ("Tue, "), month-name dates, and the listing's
+# "Tue, Nov 4, 2025" date text
+_WEEKDAY_PREFIX = re.compile(r'^[A-Za-z]+,\s*')
+_MONTH_NAME_DATE = re.compile(r'([A-Za-z]+)\s+(\d{1,2}),\s+(\d{4})')
+_LISTING_DATE = re.compile(r'(Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+([A-Za-z]+)\s+(\d+),\s+(\d{4})')
+_US_DATE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')     # 11/04/2025
+_ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')     # 2025-11-04
+
+
+@lru_cache(maxsize=4096)
 def parse_meeting_date(date_text: str) -> Optional[Tuple[int, int, int]]:
     """
     Parse date from meeting text (e.g., "Tue, Nov 4, 2025", "November 4, 2025").
@@ -65,37 +106,29 @@ def parse_meeting_date(date_text: str) -> Optional[Tuple[int, int, int]]:
     date_text = date_text.strip()
     
     # Remove day of week prefix if present (e.g., "Tue, " or "Tuesday, ")
-    date_text = re.sub(r'^[A-Za-z]+,\s*', '', date_text)
-    
-    # Try common date formats
-    formats = [
-        "%b %d, %Y",      # Nov 4, 2025
-        "%B %d, %Y",      # November 4, 2025
-        "%m/%d/%Y",       # 11/04/2025
-        "%Y-%m-%d",       # 2025-11-04
-    ]
+    date_text = _WEEKDAY_PREFIX.sub('', date_text)
     
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_text, fmt)
-            return (dt.year, dt.month, dt.day)
-        except ValueError:
-            continue
-    
-    # Try regex patterns for variations
-    # Pattern: "Nov 4, 2025" or "November 4, 2025"
-    match = re.search(r'([A-Za-z]+)\s+(\d+),\s+(\d{4})', date_text)
+    # "Nov 4, 2025" or "November 4, 2025": look the month up directly
+    # instead of trying strptime formats one after another
+    match = _MONTH_NAME_DATE.search(date_text)
     if match:
         month_name, day, year = match.groups()
-        try:
-            dt = datetime.strptime(f"{month_name} {day}, {year}", "%B %d, %Y")
-            return (dt.year, dt.month, dt.day)
-        except ValueError:
-            try:
-                dt = datetime.strptime(f"{month_name} {day}, {year}", "%b %d, %Y")
-                return (dt.year, dt.month, dt.day)
-            except ValueError:
-                pass
+        month = MONTHS.get(month_name.lower())
+        if month and is_valid_date(int(year), month, int(day)):
+            return (int(year), month, int(day))
+        return None
+    
+    # Numeric formats must be the whole string
+    match = _US_DATE.fullmatch(date_text)
+    if match:
+        month, day, year = map(int, match.groups())
+    else:
+        match = _ISO_DATE.fullmatch(date_text)
+        if not match:
+            return None
+        year, month, day = map(int, match.groups())
+    if is_valid_date(year, month, day):
+        return (year, month, day)
     
     return None
 
@@ -110,35 +143,36 @@ def extract_meeting_date_links(html: str, target_year: int, base_url: str) -> li
         List of dictionaries, each containing:
         - date_text: Raw date text from meeting (e.g., "Tue, Nov 4, 2025")
         - parsed_date: Tuple (year, month, day) or None
-        - date_selector: XPath selector to find and click this date element with Selenium
         - meeting_title: Meeting title/description
     """
-    soup = BeautifulSoup(html, 'lxml')
+    root = parse_html(html)
     meetings = []
     
     # Find the active/shown tab panel (should be 2025)
-    tab_panel = soup.find('div', class_=lambda x: x and 'showing' in str(x) and 'tab' in str(x).lower())
-    if not tab_panel:
-        tab_panel = soup.find('div', class_=lambda x: x and 'tab' in str(x).lower())
+    tab_panel = _SHOWING_TAB_PANEL(root) or _TAB_PANEL(root)
     
     if not tab_panel:
         print("Warning: Could not find tab panel", file=sys.stderr)
         return meetings
     
-    # Date pattern to match: "Tue, Nov 4, 2025"
-    date_pattern = re.compile(r'(Mon|Tue|Wed|Thu|Fri|Sat|Sun),\s+([A-Za-z]+)\s+(\d+),\s+(\d{4})')
-    
     # Find all field wrappers (these contain the dates)
-    field_wrappers = tab_panel.find_all('div', class_='cp-fieldWrapper')
+    field_wrappers = select(tab_panel[0], 'div.cp-fieldWrapper')
+    year_text = str(target_year)
     
     for wrapper in field_wrappers:
         # Get the text content
-        text = wrapper.get_text(strip=True)
+        text = text_of(wrapper)
+        
+        # Titles and other-year dates are dropped before running the date regex
+        if year_text not in text:
+            continue
         
         # Check if this wrapper contains a date
-        match = date_pattern.search(text)
+        match = _LISTING_DATE.search(text)
         if match:
             day_of_week, month_name, day, year = match.groups()
+            if year != year_text:
+                continue
             date_text = match.group(0)  # Full match like "Tue, Nov 4, 2025"
             
             # Parse the date
@@ -148,30 +182,16 @@ def extract_meeting_date_links(html: str, target_year: int, base_url: str) -> li
             
             # Find the clickable parent container (cp-formatField--stacked)
             # This is the element we need to click
-            parent = wrapper.parent
-            clickable_container = None
-            
-            # Walk up the tree to find cp-formatField--stacked
-            for _ in range(5):
-                if parent and 'cp-formatField' in str(parent.get('class', [])):
-                    clickable_container = parent
-                    break
-                if parent:
-                    parent = parent.parent
-                else:
-                    break
-            
-            # Create XPath selector to find this date element
-            # We'll use the date text to find it uniquely
-            date_selector = f"//div[contains(@class, 'cp-fieldWrapper') and contains(text(), '{date_text}')]"
+            containers = _CLICKABLE_CONTAINER(wrapper)
+            clickable_container = containers[0] if containers else None
             
             # Extract meeting title from surrounding elements
             meeting_title = date_text
             # Look for "City Council" in nearby field wrappers
-            if clickable_container:
-                all_wrappers = clickable_container.find_all('div', class_='cp-fieldWrapper')
+            if clickable_container is not None:
+                all_wrappers = select(clickable_container, 'div.cp-fieldWrapper')
                 for w in all_wrappers:
-                    wrapper_text = w.get_text(strip=True)
+                    wrapper_text = text_of(w)
                     if 'City Council' in wrapper_text or 'Regular Meeting' in wrapper_text or 'Strategic' in wrapper_text:
                         meeting_title = date_text + " " + wrapper_text
                         break
@@ -203,28 +223,17 @@ def click_date_and_get_minutes(driver, date_text: str, base_url: str) -> Optiona
     from selenium.webdriver.support import expected_conditions as EC
     
     try:
-        # Wait a moment for page to be ready
-        time.sleep(1)
-        
         # Find the date element by text content (more reliable than XPath with classes)
         date_elem = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, f"//div[contains(@class, 'cp-fieldWrapper') and normalize-space(text())='{date_text}']"))
+            EC.presence_of_element_located((By.XPATH, _DATE_ELEM_XPATH.format(date_text)))
         )
         
-        # Find the parent cp-formatField container - walk up the DOM
-        parent = date_elem
-        clickable_container = None
-        for _ in range(5):
-            try:
-                parent = parent.find_element(By.XPATH, "./..")
-                classes = parent.get_attribute('class') or ''
-                if 'cp-formatField' in classes:
-                    clickable_container = parent
-                    break
-            except:
-                break
+        # Find the parent cp-formatField container in one browser round trip
+        # instead of a find_element/get_attribute pair per ancestor
+        containers = date_elem.find_elements(By.XPATH, _CLICKABLE_CONTAINER_PATH)
+        clickable_container = containers[0] if containers else None
         
-        if not clickable_container:
+        if clickable_container is None:
             # Fallback: just click the parent of the date element
             try:
                 clickable_container = date_elem.find_element(By.XPATH, "./..")
@@ -233,19 +242,18 @@ def click_date_and_get_minutes(driver, date_text: str, base_url: str) -> Optiona
         
         # Click using JavaScript (more reliable)
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", clickable_container)
-        time.sleep(0.5)
         
         # Store current URL to verify navigation
         current_url_before = driver.current_url
         
         driver.execute_script("arguments[0].click();", clickable_container)
-        time.sleep(4)  # Wait for navigation
         
-        # Verify URL changed (or check if overlay/modal opened)
-        current_url_after = driver.current_url
-        if current_url_before == current_url_after:
-            # URL didn't change - might be an overlay/modal, wait a bit more
-            time.sleep(2)
+        # Wait for navigation; if the URL never changes it may be an
+        # overlay/modal, which the Minutes link wait below covers
+        try:
+            WebDriverWait(driver, 6).until(EC.url_changes(current_url_before))
+        except TimeoutException:
+            pass
         
         # Find Minutes link on detail page
         # Look for link with text like "Minutes for 10-7-2025" or just "Minutes"
@@ -258,7 +266,7 @@ def click_date_and_get_minutes(driver, date_text: str, base_url: str) -> Optiona
                 month_day = date_parts[1].strip()  # e.g., "Nov 4"
                 # Try to find link containing both "Minutes" and the date
                 minutes_link = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, f"//a[contains(text(), 'Minutes') and (contains(text(), '{month_day}') or contains(@title, 'Minutes'))]"))
+                    EC.element_to_be_clickable((By.XPATH, _DATED_MINUTES_LINK_XPATH.format(month_day)))
                 )
                 minutes_url = minutes_link.get_attribute('href')
             else:
@@ -291,6 +299,28 @@ def click_date_and_get_minutes(driver, date_text: str, base_url: str) -> Optiona
         return None
 
 
+def reload_listing(driver, page_url: str, target_year: int) -> None:
+    """
+    Load the listing page and open the target-year (first) tab.
+    
+    Waits for the tab list and then for a field wrapper mentioning
+    target_year to appear rather than sleeping a fixed time after each step.
+    """
+    driver.get(page_url)
+    try:
+        tabs = WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.tabbedWidget--tab"))
+        )
+    except TimeoutException:
+        tabs = []
+    if tabs:
+        driver.execute_script("arguments[0].click();", tabs[0])
+    # Wait for content to be ready (the tab's content loads via AJAX)
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.XPATH, _YEAR_WRAPPER_XPATH.format(target_year)))
+    )
+
+
 def download_and_save(
     url: str,
     source_id: str,
@@ -325,7 +355,7 @@ def download_and_save(
             return result
         
         # Download
-        content_bytes, content_type = download_url(url)
+        content_bytes, content_type = download_url(url, session=SESSION)
         
         # Check if PDF
         if not is_pdf_content(content_type, content_bytes):
@@ -374,6 +404,8 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Parse page but don't download")
     parser.add_argument("--outdir", help="Override output directory (relative to backend/)")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of PDFs to download (for testing)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent PDF downloads (default: {DEFAULT_WORKERS})")
     args = parser.parse_args()
     
     # Load config
@@ -406,28 +438,25 @@ def main():
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36")
-    
+    # Only text and anchors are read, so return from driver.get once the DOM
+    # is parsed and skip images; explicit waits cover the rest. Stylesheets
+    # stay on: the clickable waits depend on elements being laid out.
+    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2,
+    })
+
     driver = None
     try:
         driver = webdriver.Chrome(options=chrome_options)
-        driver.get(page_url)
-        
-        # Wait for page to load
-        time.sleep(3)
         
-        # Wait for page to load and click the 2025 tab
-        # Find all tabs and click the first one (which should be 2025)
+        # Load the page and click the 2025 tab (the first one), waiting for
+        # its meetings to appear
         try:
-            tabs = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.tabbedWidget--tab"))
-            )
-            if tabs:
-                # Click the first tab (2025) using JavaScript
-                driver.execute_script("arguments[0].scrollIntoView(true);", tabs[0])
-                time.sleep(0.5)
-                driver.execute_script("arguments[0].click();", tabs[0])
-                print("Clicked 2025 tab", file=sys.stderr)
-                time.sleep(5)  # Wait for tab content to load via AJAX
+            reload_listing(driver, page_url, target_year)
+            print("Clicked 2025 tab", file=sys.stderr)
         except Exception as e:
             print(f"Warning: Could not click tab: {e}", file=sys.stderr)
         
@@ -467,6 +496,13 @@ def main():
             "errors": 0
         }
         
+        # PDFs download on a small pool over the shared session while Selenium
+        # moves on to the next meeting. downloads keeps meeting order: a Future
+        # per submitted download, or the error dict of a meeting that failed
+        # before reaching one.
+        pool = ThreadPoolExecutor(max_workers=max(1, args.workers))
+        downloads = []
+        
         for meeting in meetings_2025:
             parsed_date = meeting['parsed_date']
             if not parsed_date:
@@ -486,22 +522,14 @@ def main():
                     print(f"  Warning: No minutes link found for {meeting['date_text']}", file=sys.stderr)
                     results["errors"] += 1
                     # Navigate back to main page and reload
-                    driver.get(page_url)
-                    time.sleep(3)
-                    tabs = driver.find_elements(By.CSS_SELECTOR, "li.tabbedWidget--tab")
-                    if tabs:
-                        driver.execute_script("arguments[0].click();", tabs[0])
-                        time.sleep(5)  # Wait longer for AJAX content to load
-                    # Wait for content to be ready
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'cp-fieldWrapper')]"))
-                    )
+                    reload_listing(driver, page_url, target_year)
                     continue
                 
                 print(f"  Found minutes URL: {minutes_url}", file=sys.stderr)
                 
-                # Download the PDF
-                result = download_and_save(
+                # Download the PDF in the background
+                future = pool.submit(
+                    download_and_save,
                     url=minutes_url,
                     source_id=source_id,
                     city_name=city_name,
@@ -511,56 +539,53 @@ def main():
                     output_base=output_base,
                     allowed_domains=allowed_domains
                 )
+                downloads.append(future)
                 
-                results["downloads"].append(result)
-                
-                if result["status"] == "created":
-                    results["saved"] += 1
-                    print(f"  ✓ Downloaded: {result.get('saved_path', 'N/A')}", file=sys.stderr)
-                elif result["status"] == "duplicate":
-                    results["duplicates"] += 1
-                    print(f"  ⊘ Duplicate: {result.get('saved_path', 'N/A')}", file=sys.stderr)
-                else:
-                    results["errors"] += 1
-                    print(f"  ✗ Error: {result.get('reason', 'Unknown error')}", file=sys.stderr)
-                
-                # Check if we've hit the limit
-                if args.limit and (results["saved"] + results["duplicates"]) >= args.limit:
-                    print(f"Reached limit of {args.limit} downloads", file=sys.stderr)
-                    break
+                # Check if we've hit the limit; it counts finished downloads,
+                # so with --limit each download is waited for
+                if args.limit:
+                    future.result()
+                    finished = sum(
+                        1 for d in downloads
+                        if isinstance(d, Future) and d.result()["status"] in ("created", "duplicate")
+                    )
+                    if finished >= args.limit:
+                        print(f"Reached limit of {args.limit} downloads", file=sys.stderr)
+                        break
                 
                 # Navigate back to main page and reload
-                driver.get(page_url)
-                time.sleep(3)
-                tabs = driver.find_elements(By.CSS_SELECTOR, "li.tabbedWidget--tab")
-                if tabs:
-                    driver.execute_script("arguments[0].click();", tabs[0])
-                    time.sleep(5)  # Wait longer for AJAX content to load
-                # Wait for content to be ready
-                WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'cp-fieldWrapper')]"))
-                )
+                reload_listing(driver, page_url, target_year)
                 
             except Exception as e:
                 results["errors"] += 1
-                results["downloads"].append({"status": "error", "reason": str(e), "url": meeting.get('meeting_url', 'N/A')})
+                downloads.append({"status": "error", "reason": str(e), "url": meeting.get('meeting_url', 'N/A')})
                 print(f"  ✗ Exception: {e}", file=sys.stderr)
                 # Try to navigate back to main page on error
                 try:
-                    driver.get(page_url)
-                    time.sleep(3)
-                    tabs = driver.find_elements(By.CSS_SELECTOR, "li.tabbedWidget--tab")
-                    if tabs:
-                        driver.execute_script("arguments[0].click();", tabs[0])
-                        time.sleep(5)
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'cp-fieldWrapper')]"))
-                    )
+                    reload_listing(driver, page_url, target_year)
                 except:
                     pass
             
             time.sleep(1.0)  # Be polite
         
+        pool.shutdown(wait=True)
+        for item in downloads:
+            if not isinstance(item, Future):
+                results["downloads"].append(item)
+                continue
+            result = item.result()
+            results["downloads"].append(result)
+            
+            if result["status"] == "created":
+                results["saved"] += 1
+                print(f"  ✓ Downloaded: {result.get('saved_path', 'N/A')}", file=sys.stderr)
+            elif result["status"] == "duplicate":
+                results["duplicates"] += 1
+                print(f"  ⊘ Duplicate: {result.get('saved_path', 'N/A')}", file=sys.stderr)
+            else:
+                results["errors"] += 1
+                print(f"  ✗ Error: {result.get('reason', 'Unknown error')}", file=sys.stderr)
+        
         print(f"\nSummary: {results['saved']} saved, {results['duplicates']} duplicates, {results['errors']} errors", file=sys.stderr)
         print(json.dumps(results))
         
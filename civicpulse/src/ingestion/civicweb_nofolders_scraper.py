@@ -21,18 +21,29 @@ import json
 import re
 import sys
 import time
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 # Make sure we can import ingestion utilities when running from backend/
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from ingestion.date_patterns import MONTHS, is_valid_date  # noqa: E402
 from ingestion.local_db import init_db, save_if_new  # noqa: E402
-from ingestion.single_link_scraper import download_url, is_allowed_domain, is_pdf_content  # noqa: E402
+from ingestion.single_link_scraper import create_session, download_url, is_allowed_domain, is_pdf_content  # noqa: E402
+
+
+# One keep-alive session for the whole run: every PDF on the same host shares
+# pooled TCP/TLS connections, with retry/backoff on transient errors.
+SESSION = create_session(
+    {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+)
 
 
 def read_yaml(path: Path) -> dict:
@@ -45,6 +56,12 @@ def read_yaml(path: Path) -> dict:
         return yaml.safe_load(f)
 
 
+# DD MMM YYYY, matched against the upper-cased text
+_DAY_MONTH_YEAR = re.compile(r'(\d{1,2})\s+([A-Z]{3,9})\s+(\d{4})')
+_LINKS_ONLY = SoupStrainer('a', href=True)
+
+
+@lru_cache(maxsize=4096)
 def parse_meeting_date(date_text: str) -> Optional[Tuple[int, int, int]]:
     """
     Parse date from meeting square text (e.g., "14 OCT 2025", "12 Nov 2025", "City Council - 12 Nov 2025").
@@ -55,26 +72,14 @@ def parse_meeting_date(date_text: str) -> Optional[Tuple[int, int, int]]:
     date_text = date_text.strip()
     
     # Try formats like "14 OCT 2025", "12 Nov 2025", or "City Council - 12 Nov 2025"
-    month_map = {
-        'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
-        'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12,
-        'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4, 'JUNE': 6,
-        'JULY': 7, 'AUGUST': 8, 'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12
-    }
-    
     # Pattern: DD MMM YYYY (case insensitive)
-    # Also handle "City Council - 12 Nov 2025" format
-    match = re.search(r'(\d{1,2})\s+([A-Z]{3,9})\s+(\d{4})', date_text.upper())
+    match = _DAY_MONTH_YEAR.search(date_text.upper())
     if match:
         day, month_str, year = match.groups()
-        if month_str in month_map:
-            month = month_map[month_str]
-            try:
-                # Validate date
-                datetime(int(year), month, int(day))
-                return (int(year), month, int(day))
-            except ValueError:
-                return None
+        month = MONTHS.get(month_str.lower())
+        if month:
+            year, day = int(year), int(day)
+            return (year, month, day) if is_valid_date(year, month, day) else None
     
     return None
 
@@ -90,7 +95,8 @@ def extract_meeting_squares(html: str, target_year: int, base_url: str) -> list:
         - meeting_url: URL to meeting detail page
         - meeting_title: Meeting title/description
     """
-    soup = BeautifulSoup(html, 'lxml')
+    # Only links are needed, so only <a href> subtrees are built into the soup
+    soup = BeautifulSoup(html, 'lxml', parse_only=_LINKS_ONLY)
     meetings = []
     
     # Look for links that contain date patterns and "City Council" or similar
@@ -230,7 +236,7 @@ def download_and_save(
             return result
         
         # Download
-        content_bytes, content_type = download_url(url)
+        content_bytes, content_type = download_url(url, session=SESSION)
         
         # Check if PDF
         if not is_pdf_content(content_type, content_bytes):
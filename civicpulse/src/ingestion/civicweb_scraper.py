@@ -19,18 +19,50 @@ Usage (run from backend/):
 
 import argparse
 import json
+import os
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Optional, Tuple
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlsplit
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 
 # Make sure we can import ingestion utilities when running from backend/
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from ingestion.local_db import init_db, save_if_new  # noqa: E402
+from ingestion.html_tree import parse_html, text_of  # noqa: E402
+from ingestion.local_db import DocumentBatch, init_db, save_if_new_by_hash  # noqa: E402
+from ingestion.single_link_scraper import (  # noqa: E402
+    create_session,
+    download_to_file,
+    fetch_html_conditional,
+    is_allowed_domain,
+    move_into_place,
+    sanitize_filename,
+)
+
+
+# Downloads run on a small thread pool sharing the session's connection pool;
+# each worker pauses briefly before its request to stay polite.
+DEFAULT_WORKERS = 4
+REQUEST_DELAY = 0.25
+
+# Compiled once; each evaluates in a single C-level pass over the parsed page.
+_FOLDER_LINKS = etree.XPath("//a[starts-with(@href, '/filepro/documents/')]")
+_FOLDER_ROWS = etree.XPath("//table//tbody//tr")
+_ROW_FOLDER_LINK = etree.XPath(".//a[starts-with(@href, '/filepro/documents/')][1]")
+_MEETING_FOLDER_LINKS = etree.XPath(
+    "//a[starts-with(@href, '/filepro/documents/')"
+    " and not(contains(@href, '/document/'))"
+    " and not(substring(translate(@href, 'PDF', 'pdf'), string-length(@href) - 3) = '.pdf')]"
+)
+_DOCUMENT_LINKS = etree.XPath(
+    "//a[(starts-with(@href, '/filepro/document/')"
+    " and contains(translate(@href, 'PDF', 'pdf'), '.pdf'))"
+    " or starts-with(@href, '/document/')]"
+)
 
 
 def read_yaml(path: Path) -> dict:
@@ -43,73 +75,73 @@ def read_yaml(path: Path) -> dict:
         return yaml.safe_load(f)
 
 
-def fetch(session: requests.Session, base_url: str, href: str, timeout: int = 20) -> requests.Response:
-    url = urljoin(base_url, href)
-    resp = session.get(url, timeout=timeout)
-    resp.raise_for_status()
-    return resp
+def fetch_html(session: requests.Session, base_url: str, href: str, timeout: int = 20) -> str:
+    """Fetch a folder page, revalidating the locally cached copy (ETag / Last-Modified)."""
+    return fetch_html_conditional(session, urljoin(base_url, href), timeout=timeout)
 
 
 def ensure_allowed_domain(url: str, allowed_domains: list) -> bool:
+    """Check url's host with is_allowed_domain() (exact or subdomain match)."""
     try:
-        host = urlparse(url).hostname or ""
-    except Exception:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return False
+    if not host:
         return False
-    return any(host.endswith(d) for d in allowed_domains)
+    return is_allowed_domain(host, allowed_domains)
 
 
-def find_folder_href(html: str, folder_name: str) -> Optional[str]:
+def find_folder_href(html, folder_name: str) -> Optional[str]:
     """
     Find the href to a folder by matching its name (case-insensitive, partial match).
-    Returns the first matching folder link.
+    Returns the first matching folder link. Accepts raw HTML or a parsed tree.
     """
-    soup = BeautifulSoup(html, "lxml")
+    tree = parse_html(html)
     folder_name_lower = folder_name.lower()
+    folder_links = _FOLDER_LINKS(tree)
     
     # Strategy 1: exact anchor text match
-    for a in soup.select("a[href^='/filepro/documents/']"):
-        label = a.get_text(strip=True)
+    for a in folder_links:
+        label = text_of(a)
         if label.lower() == folder_name_lower:
             return a.get("href")
     
     # Strategy 2: row text contains the folder name; pick the first /documents/ link in that row
-    for tr in soup.select("table tbody tr"):
-        row_text = tr.get_text(separator=" ", strip=True)
+    for tr in _FOLDER_ROWS(tree):
+        row_text = text_of(tr, separator=" ")
         if folder_name_lower in row_text.lower():
-            a = tr.select_one("a[href^='/filepro/documents/']")
-            if a:
-                return a.get("href")
+            links = _ROW_FOLDER_LINK(tr)
+            if links:
+                return links[0].get("href")
     
     # Strategy 3: partial match on anchor text
-    for a in soup.select("a[href^='/filepro/documents/']"):
-        label = a.get_text(strip=True)
+    for a in folder_links:
+        label = text_of(a)
         if folder_name_lower in label.lower() or label.lower() in folder_name_lower:
             return a.get("href")
     
     return None
 
 
-def find_year_href(html: str, target_year: int) -> Optional[str]:
+def find_year_href(html, target_year: int) -> Optional[str]:
     """
     Parse the root folder page and return the href to the specific year folder (e.g., "2025").
     """
     return find_folder_href(html, str(target_year))
 
 
-def iter_meeting_folder_links(year_page_html: str):
+def iter_meeting_folder_links(year_page_html):
     """
     Yield (title, href) for meeting folder links on the year page.
     Used for cities like Leawood that have nested structure: Year -> Meeting Folders -> PDFs
+    Accepts raw HTML or a parsed tree.
     """
-    soup = BeautifulSoup(year_page_html, "lxml")
-    # Look for folder links (typically /filepro/documents/...)
-    # Exclude direct PDF links and the year folder itself
-    for a in soup.select("a[href^='/filepro/documents/']"):
+    tree = parse_html(year_page_html)
+    # Folder links (typically /filepro/documents/...); the XPath already
+    # excludes direct PDF links and /document/ links
+    for a in _MEETING_FOLDER_LINKS(tree):
         href = a.get("href", "")
-        title = a.get_text(strip=True)
-        # Skip if it's a PDF link
-        if href.lower().endswith(".pdf") or "/document/" in href:
-            continue
+        title = text_of(a)
         # Skip if it's just a number (likely the year folder itself)
         if title.strip().isdigit():
             continue
@@ -117,7 +149,7 @@ def iter_meeting_folder_links(year_page_html: str):
         yield title, href
 
 
-def iter_document_links(year_page_html: str):
+def iter_document_links(year_page_html):
     """
     Yield (title, href) for rows that link to documents.
     Supports two patterns:
@@ -125,19 +157,22 @@ def iter_document_links(year_page_html: str):
       2) Item links:       /document/<id>  (construct PDF URL using the title)
     
     Only yields PDF links (filters out HTML and other file types).
+    Accepts raw HTML or a parsed tree.
     """
-    soup = BeautifulSoup(year_page_html, "lxml")
-    # Pattern 1: already a direct PDF link
-    for a in soup.select("a[href^='/filepro/document/']"):
+    tree = parse_html(year_page_html)
+    # One XPath pass returns both patterns; direct PDF links are yielded first
+    item_links = []
+    for a in _DOCUMENT_LINKS(tree):
         href = a.get("href", "")
-        title = a.get_text(strip=True) or Path(href).name
-        # Only yield PDF links
-        if href.lower().endswith(".pdf") or ".pdf" in href.lower():
-            yield title, href
+        if href.startswith("/document/"):
+            item_links.append(a)
+            continue
+        # Pattern 1: already a direct PDF link (XPath filtered on ".pdf")
+        yield text_of(a) or Path(href).name, href
     # Pattern 2: item page links, construct the full PDF URL
-    for a in soup.select("a[href^='/document/']"):
+    for a in item_links:
         href = a.get("href", "")
-        title = a.get_text(strip=True)
+        title = text_of(a)
         # Expect href like /document/450247
         parts = href.strip("/").split("/")
         if len(parts) == 2 and parts[0] == "document" and title:
@@ -148,6 +183,13 @@ def iter_document_links(year_page_html: str):
                 yield title, constructed
 
 
+def _looks_like_pdf(content_type: str, head: bytes) -> bool:
+    """Header/magic-byte check applied before the rest of the body is fetched."""
+    if "html" in content_type.lower() or head.strip().startswith(b"<"):
+        return False
+    return "pdf" in content_type.lower() or head.startswith(b"%PDF")
+
+
 def download_and_save(
     session: requests.Session,
     base_url: str,
@@ -157,45 +199,82 @@ def download_and_save(
     doc_title: str,
     href: str,
     output_base: Path,
+    batch: Optional[DocumentBatch] = None,
+    dest_dir: Optional[str] = None,
 ) -> dict:
+    """
+    Download one document and record it. With a DocumentBatch the database row
+    is queued, and the returned dict's status/document_id are set on flush.
+    dest_dir is output_base/city_name precomputed as a string by main().
+    """
     url = urljoin(base_url, href)
     if not ensure_allowed_domain(url, allowed_domains):
         return {"status": "error", "reason": f"Domain not allowed for url: {url}", "url": url}
 
-    # Download bytes
-    r = session.get(url, timeout=60)
-    r.raise_for_status()
-    content_type = r.headers.get("Content-Type", "")
-    # Filter out HTML files - only accept PDFs
-    if "html" in content_type.lower() or r.content.strip().startswith(b"<"):
-        return {"status": "error", "reason": f"Not a PDF (HTML detected): {content_type}", "url": url}
-    if "pdf" not in content_type.lower() and not r.content.startswith(b"%PDF"):
-        return {"status": "error", "reason": f"Not a PDF: {content_type}", "url": url}
-
-    # Save to DB via existing ingestion util
-    db_result = save_if_new(source_id=source_id, file_url=url, content_bytes=r.content)
-
-    # Always persist file to disk if it doesn't exist (even if duplicate in DB)
     # Sanitize filename
-    safe_title = "".join(ch for ch in doc_title if ch.isalnum() or ch in (" ", "_", "-", ".")).rstrip()
+    safe_title = sanitize_filename(doc_title)
     filename = f"{safe_title}.pdf"
-    dest_dir = output_base / city_name
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    out_path = dest_dir / filename
-    
-    # Only write if file doesn't exist
-    if not out_path.exists():
-        with open(out_path, "wb") as f:
-            f.write(r.content)
-
-    return {
-        "status": db_result["status"],
-        "document_id": db_result["document_id"],
-        "content_hash": db_result["content_hash"],
-        "bytes_size": db_result["bytes_size"],
+    # output_base / city_name is created once by main()
+    if dest_dir is None:
+        dest_dir = os.path.join(output_base, city_name)
+    out_path = os.path.join(dest_dir, filename)
+
+    # Stream to a temp file next to the destination, hashing in flight
+    download = download_to_file(url, dest_dir, session=session, accept=_looks_like_pdf)
+    tmp_path = download["path"]
+    result = {
+        "status": None,
+        "document_id": None,
+        "content_hash": download["content_hash"],
+        "bytes_size": download["bytes_size"],
         "url": url,
-        "saved_path": str(out_path) if out_path else None,
+        "saved_path": out_path,
+        "file_created": False,
     }
+    try:
+        content_type = download["content_type"]
+        head = download["head"]
+        # Filter out HTML files - only accept PDFs
+        if "html" in content_type.lower() or head.strip().startswith(b"<"):
+            return {"status": "error", "reason": f"Not a PDF (HTML detected): {content_type}", "url": url}
+        if "pdf" not in content_type.lower() and not head.startswith(b"%PDF"):
+            return {"status": "error", "reason": f"Not a PDF: {content_type}", "url": url}
+
+        # Record the row before publishing the file, so a failed database
+        # write does not leave an untracked file behind
+        if batch is not None:
+            batch.add(source_id, url, download["content_hash"], download["bytes_size"], result)
+        else:
+            # Save to DB via existing ingestion util
+            db_result = save_if_new_by_hash(
+                source_id=source_id,
+                file_url=url,
+                content_hash=download["content_hash"],
+                bytes_size=download["bytes_size"],
+            )
+            result["status"] = db_result["status"]
+            result["document_id"] = db_result["document_id"]
+
+        # Always persist file to disk if it doesn't exist (even if duplicate in DB)
+        result["file_created"] = move_into_place(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return result
+
+
+def remove_unrecorded_files(downloads: list) -> None:
+    """
+    Delete files this run published whose database row could not be written
+    (a failed DocumentBatch flush), so the output holds no untracked PDFs.
+    """
+    for res in downloads:
+        if res["status"] == "error" and res.get("file_created"):
+            try:
+                os.unlink(res["saved_path"])
+            except OSError:
+                pass
+            res["file_created"] = False
 
 
 def main():
@@ -203,6 +282,7 @@ def main():
     parser.add_argument("--config", required=True, help="Path to YAML config (relative to backend/configs/ allowed)")
     parser.add_argument("--limit", type=int, default=None, help="Max files to download")
     parser.add_argument("--outdir", default=None, help="Override output directory (relative to backend/)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent downloads")
     args = parser.parse_args()
 
     # Resolve config path relative to backend/ if needed
@@ -227,9 +307,11 @@ def main():
 
     # Determine output directory
     output_base = Path(args.outdir) if args.outdir else backend_dir / config.get("output_dir", "data/raw notes")
+    dest_dir = os.path.join(output_base, city_name)
+    os.makedirs(dest_dir, exist_ok=True)
 
-    session = requests.Session()
-    session.headers.update(
+    # Pooled keep-alive connections with retry/backoff on transient errors
+    session = create_session(
         {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
@@ -240,114 +322,114 @@ def main():
     )
 
     # 1) Load root folder
-    root_resp = fetch(session, base_url, root_folder_url)
+    root_html = fetch_html(session, base_url, root_folder_url)
     
     # 2) Follow navigation_path if specified, otherwise use legacy year-first logic
     navigation_path = config.get("navigation_path", [])
-    current_resp = root_resp
-    current_html = root_resp.text
+    # Each page is parsed once; the tree is shared by every helper that inspects it
+    root_tree = parse_html(root_html)
+    current_tree = root_tree
     
     if navigation_path:
         # Follow the navigation path sequentially
         for folder_name in navigation_path:
-            folder_href = find_folder_href(current_html, folder_name)
+            folder_href = find_folder_href(current_tree, folder_name)
             if folder_href:
-                current_resp = fetch(session, base_url, folder_href)
-                current_html = current_resp.text
+                current_tree = parse_html(fetch_html(session, base_url, folder_href))
             else:
                 print(f"Warning: Could not find folder '{folder_name}' in navigation path", file=sys.stderr)
                 break
-        year_resp = current_resp
+        year_tree = current_tree
     else:
         # Legacy: year-first structure
-        year_href = find_year_href(root_resp.text, target_year)
+        year_href = find_year_href(root_tree, target_year)
         if year_href:
-            year_resp = fetch(session, base_url, year_href)
+            year_tree = parse_html(fetch_html(session, base_url, year_href))
         else:
             # Some CivicWeb folders show the current year directly on the root page.
-            year_resp = root_resp
+            year_tree = root_tree
 
     # 3) Check if this city uses nested folders (Year -> Meeting Folders -> PDFs)
     # Detect by checking if year page has folder links vs direct PDF links
-    meeting_folders = list(iter_meeting_folder_links(year_resp.text))
+    meeting_folders = list(iter_meeting_folder_links(year_tree))
     has_nested_folders = len(meeting_folders) > 0
     
     source_id = config.get("id", "lawrence_civicweb")
     results = {"downloads": [], "attempted": 0, "saved": 0, "duplicates": 0, "errors": 0}
 
-    if has_nested_folders:
-        # Nested structure: iterate through meeting folders, then extract PDFs from each
-        for meeting_title, meeting_href in meeting_folders:
-            # Fetch the meeting folder page
-            meeting_resp = fetch(session, base_url, meeting_href)
-            # Extract PDFs from this meeting folder
-            for doc_title, doc_href in iter_document_links(meeting_resp.text):
-                results["attempted"] += 1
-                try:
+    def iter_jobs():
+        """Yield (doc_title, href) for every document, fetching meeting folders lazily."""
+        if has_nested_folders:
+            # Nested structure: iterate through meeting folders, then extract PDFs from each
+            for meeting_title, meeting_href in meeting_folders:
+                meeting_tree = parse_html(fetch_html(session, base_url, meeting_href))
+                for doc_title, doc_href in iter_document_links(meeting_tree):
                     # Include meeting title in filename for context
                     full_title = f"{meeting_title}_{doc_title}" if doc_title else meeting_title
-                    res = download_and_save(
-                        session=session,
-                        base_url=base_url,
-                        allowed_domains=allowed_domains,
-                        city_name=city_name,
-                        source_id=source_id,
-                        doc_title=full_title,
-                        href=doc_href,
-                        output_base=output_base,
-                    )
-                    results["downloads"].append(res)
-                    if res["status"] == "created":
-                        results["saved"] += 1
-                    elif res["status"] == "duplicate":
-                        results["duplicates"] += 1
-                    else:
-                        results["errors"] += 1
-                except Exception as e:
-                    results["errors"] += 1
-                    results["downloads"].append({"status": "error", "reason": str(e), "href": doc_href})
-
-                # Respect limit for initial test
-                if download_limit and (results["saved"] + results["duplicates"]) >= download_limit:
+                    yield full_title, doc_href
+                time.sleep(0.5)  # Brief pause between meeting folders
+        else:
+            # Flat structure: PDFs directly on year page
+            yield from iter_document_links(year_tree)
+
+    def download(job):
+        doc_title, href = job
+        time.sleep(REQUEST_DELAY)  # be polite
+        try:
+            return download_and_save(
+                session=session,
+                base_url=base_url,
+                allowed_domains=allowed_domains,
+                city_name=city_name,
+                source_id=source_id,
+                doc_title=doc_title,
+                href=href,
+                output_base=output_base,
+                batch=batch,
+                dest_dir=dest_dir,
+            )
+        except Exception as e:
+            return {"status": "error", "reason": str(e), "href": href}
+
+    # Successful downloads so far (created or duplicate once the batch is written)
+    downloaded = 0
+
+    def limit_reached(in_flight: int) -> bool:
+        # Count in-flight downloads so concurrency never overshoots the limit
+        return bool(download_limit) and (downloaded + in_flight) >= download_limit
+
+    # Document rows are committed in batches rather than one transaction per PDF
+    batch = DocumentBatch()
+    jobs = iter_jobs()
+    # Futures in submission order, so downloads are reported in listing order
+    submitted = []
+    pending = set()
+    workers = max(1, args.workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(pending) < workers and not limit_reached(len(pending)):
+                job = next(jobs, None)
+                if job is None:
                     break
-
-                time.sleep(1.0)  # be polite
-            
-            if download_limit and (results["saved"] + results["duplicates"]) >= download_limit:
-                break
-            
-            time.sleep(0.5)  # Brief pause between meeting folders
-    else:
-        # Flat structure: PDFs directly on year page
-        for title, href in iter_document_links(year_resp.text):
-            results["attempted"] += 1
-            try:
-                res = download_and_save(
-                    session=session,
-                    base_url=base_url,
-                    allowed_domains=allowed_domains,
-                    city_name=city_name,
-                    source_id=source_id,
-                    doc_title=title,
-                    href=href,
-                    output_base=output_base,
-                )
-                results["downloads"].append(res)
-                if res["status"] == "created":
-                    results["saved"] += 1
-                elif res["status"] == "duplicate":
-                    results["duplicates"] += 1
-                else:
-                    results["errors"] += 1
-            except Exception as e:
-                results["errors"] += 1
-                results["downloads"].append({"status": "error", "reason": str(e), "href": href})
-
-            # Respect limit for initial test
-            if download_limit and (results["saved"] + results["duplicates"]) >= download_limit:
+                results["attempted"] += 1
+                future = pool.submit(download, job)
+                submitted.append(future)
+                pending.add(future)
+            if not pending:
                 break
-
-            time.sleep(1.0)  # be polite
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            downloaded += sum(future.result()["status"] != "error" for future in done)
+    batch.flush()
+    results["downloads"] = [future.result() for future in submitted]
+    remove_unrecorded_files(results["downloads"])
+
+    for res in results["downloads"]:
+        if res["status"] == "created":
+            results["saved"] += 1
+        elif res["status"] == "duplicate":
+            results["duplicates"] += 1
+        else:
+            results["errors"] += 1
 
     print(json.dumps(results))
 
@@ -7,6 +7,7 @@ import argparse
 import json
 import re
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict
 
@@ -95,8 +96,7 @@ def load_config(path: str) -> dict:
         raise FileNotFoundError(f"Schema file not found: {schema_path}")
     
     # Load schema
-    with open(schema_path, 'r') as f:
-        schema = json.load(f)
+    schema = _load_schema(str(schema_path), schema_path.stat().st_mtime_ns)
     
     # Load config
     with open(config_path, 'r') as f:
@@ -108,6 +108,16 @@ def load_config(path: str) -> dict:
     return config
 
 
+@lru_cache(maxsize=8)
+def _load_schema(schema_path: str, mtime_ns: int) -> dict:
+    """
+    Parse schema.json once per file version; the mtime in the cache key
+    picks up edits. Callers must treat the returned dict as read-only.
+    """
+    with open(schema_path, 'r') as f:
+        return json.load(f)
+
+
 def _validate_config(config: dict, schema: dict):
     """Simple validation against schema."""
     # Check required fields
@@ -0,0 +1,30 @@
+"""
+Month-name lookup and date validation shared by the scrapers' date parsers.
+
+Each parser matches its site's date format with one precompiled regex and
+turns the captured fields into a (year, month, day) tuple with these
+helpers, instead of trying a cascade of strptime formats.
+"""
+
+import calendar
+
+
+# Lowercased month names and abbreviations -> month number
+MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9,
+    'oct': 10, 'october': 10, 'nov': 11, 'november': 11, 'dec': 12, 'december': 12,
+}
+
+# Days per month in a non-leap year
+_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_valid_date(year: int, month: int, day: int) -> bool:
+    """Check a (year, month, day) triple with integer comparisons only."""
+    if not (1 <= year <= 9999 and 1 <= month <= 12 and day >= 1):
+        return False
+    if month == 2 and calendar.isleap(year):
+        return day <= 29
+    return day <= _DAYS[month - 1]
@@ -0,0 +1,180 @@
+"""
+Thin HTML parsing adapter shared by the scrapers.
+
+Pages are parsed once into an lxml tree (C parser) and queried through
+CSS selectors that are translated to XPath once per process, instead of
+building a BeautifulSoup tree and re-translating selectors on every call.
+
+When html5-parser is installed, parse_html uses it: a C implementation of
+the HTML5 parsing algorithm that builds the lxml tree directly, so pages
+parse as a browser would (e.g. <tbody> is implied, matching selectors
+copied from devtools). iter_select always streams through libxml2.
+"""
+
+from functools import lru_cache
+from io import BytesIO
+
+import cssselect
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+try:
+    import html5_parser
+except ImportError:  # optional: falls back to libxml2's HTML parser
+    html5_parser = None
+
+
+def parse_html(html):
+    """
+    Parse an HTML document (str or bytes) into an lxml element tree.
+
+    Returns the <html> root element. Empty documents yield an empty tree
+    rather than raising, matching BeautifulSoup's behaviour. An already
+    parsed element is returned unchanged, so helpers can accept either.
+    """
+    if not isinstance(html, (str, bytes)):
+        return html
+    if not html or not html.strip():
+        return lxml.html.document_fromstring("<html></html>")
+    if html5_parser is not None:
+        return html5_parser.parse(html, treebuilder="lxml", namespace_elements=False)
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode input with an XML encoding declaration must be parsed as bytes
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+
+
+@lru_cache(maxsize=None)
+def css(selector: str) -> CSSSelector:
+    """Return a compiled CSS selector, cached per selector string."""
+    return CSSSelector(selector, translator="html")
+
+
+def select(node, selector: str) -> list:
+    """Return all elements under node matching the CSS selector."""
+    return css(selector)(node)
+
+
+def select_one(node, selector: str):
+    """Return the first element under node matching the CSS selector, or None."""
+    matches = css(selector)(node)
+    return matches[0] if matches else None
+
+
+@lru_cache(maxsize=None)
+def _target_tag(selector: str):
+    """
+    Return the element name every match of selector must have, or None if
+    the selector can match more than one tag (e.g. "*", ".row", "a, tr").
+    """
+    tags = set()
+    for parsed in cssselect.parse(selector):
+        node = parsed.parsed_tree
+        while not isinstance(node, cssselect.parser.Element):
+            node = node.subselector if hasattr(node, "subselector") else node.selector
+        tags.add(node.element)
+    if len(tags) == 1 and None not in tags:
+        return tags.pop()
+    return None
+
+
+# Axis from a matched element back to the left-hand side of each combinator
+_COMBINATOR_AXES = {
+    " ": "ancestor::",
+    ">": "parent::",
+    "~": "preceding-sibling::",
+    "+": "preceding-sibling::*[1]/self::",
+}
+
+
+def _anchored(tree, translator):
+    """
+    Return (element, condition) testing a parsed selector against the
+    element itself, with combinators turned into predicates on its
+    ancestors and preceding siblings rather than paths down from the root.
+    """
+    if isinstance(tree, cssselect.parser.CombinedSelector):
+        element, condition = _anchored(tree.subselector, translator)
+        left_element, left_condition = _anchored(tree.selector, translator)
+        step = _COMBINATOR_AXES[tree.combinator] + left_element
+        if left_condition:
+            step += f"[{left_condition}]"
+        return element, f"({condition}) and {step}" if condition else step
+    expr = translator.xpath(tree)
+    return expr.element, expr.condition
+
+
+@lru_cache(maxsize=None)
+def _self_match(selector: str) -> etree.XPath:
+    """Return a compiled XPath that is true when its context node matches selector."""
+    translator = cssselect.HTMLTranslator()
+    tests = []
+    for parsed in cssselect.parse(selector):
+        element, condition = _anchored(parsed.parsed_tree, translator)
+        tests.append(f"self::{element}[{condition}]" if condition else f"self::{element}")
+    return etree.XPath(f"boolean({' | '.join(tests)})")
+
+
+def _empty(elem):
+    """Drop an element's content, keeping its tag and attributes for sibling tests."""
+    del elem[:]
+    elem.text = None
+
+
+def iter_select(html, selector: str):
+    """
+    Yield the elements of an HTML document matching selector while it is
+    being parsed, keeping memory proportional to one match, not the page.
+
+    Each element is tested on its own when it closes, against its ancestors
+    and preceding siblings, so the cost per element does not grow with the
+    page. A match is complete (all of its descendants parsed) when yielded
+    and is emptied once the consumer moves on, as is every other finished
+    element outside a possible match, so callers must not keep references
+    to it. Finished elements keep their tag and attributes, so combinators
+    and positional pseudo-classes work, except those that look at later
+    siblings (e.g. ":last-child", ":nth-last-child"). Selectors that do not
+    pin down a single tag (e.g. ".row") cannot be pruned and hold the page.
+
+    An already parsed tree is searched with the normal selector instead.
+    """
+    if not isinstance(html, (str, bytes)):
+        yield from css(selector)(html)
+        return
+    if isinstance(html, str):
+        html, encoding = html.encode("utf-8"), "utf-8"
+    else:
+        encoding = None
+    if not html.strip():
+        return
+
+    matches = _self_match(selector)
+    tag = _target_tag(selector)
+    # Open elements that could still match; their content must be kept
+    open_candidates = 0
+    events = etree.iterparse(
+        BytesIO(html), events=("start", "end"), html=True, encoding=encoding,
+    )
+    for event, elem in events:
+        candidate = tag is None or elem.tag == tag
+        if event == "start":
+            open_candidates += candidate
+            continue
+        if candidate:
+            open_candidates -= 1
+            if matches(elem):
+                yield elem
+        if not open_candidates:
+            _empty(elem)
+
+
+def text_of(node, separator: str = "") -> str:
+    """
+    Return the stripped text content of node.
+
+    Equivalent to BeautifulSoup's get_text(separator, strip=True).
+    """
+    return separator.join(s.strip() for s in node.itertext() if s.strip())
+
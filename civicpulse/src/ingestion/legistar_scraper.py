@@ -20,18 +20,35 @@ import json
 import re
 import sys
 import time
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
-import requests
-from bs4 import BeautifulSoup
+from lxml import etree
 
 # Make sure we can import ingestion utilities when running from backend/
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from ingestion.date_patterns import is_valid_date  # noqa: E402
+from ingestion.html_tree import parse_html, text_of  # noqa: E402
 from ingestion.local_db import init_db, save_if_new  # noqa: E402
-from ingestion.single_link_scraper import download_url, is_allowed_domain, is_pdf_content  # noqa: E402
+from ingestion.single_link_scraper import (  # noqa: E402
+    create_session,
+    download_url,
+    is_allowed_domain,
+    is_pdf_content,
+    sanitize_filename,
+)
+
+
+# One keep-alive session for the whole run: every PDF on the same host shares
+# pooled TCP/TLS connections, with retry/backoff on transient errors.
+SESSION = create_session(
+    {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+)
 
 
 def read_yaml(path: Path) -> dict:
@@ -44,6 +61,16 @@ def read_yaml(path: Path) -> dict:
         return yaml.safe_load(f)
 
 
+# M/D/YYYY at the start of a cell, and a cell holding nothing but one
+_LEGISTAR_DATE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_DATE_ONLY = re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$')
+
+# Minutes links ("View.ashx?M=M&ID=..."), page-wide and within one cell
+_MINUTES_LINKS = etree.XPath("//a[contains(@href, 'View.ashx?M=M')]")
+_CELL_MINUTES_LINK = etree.XPath(".//a[contains(@href, 'View.ashx?M=M')][1]")
+
+
+@lru_cache(maxsize=4096)
 def parse_legistar_date(date_text: str) -> Optional[Tuple[int, int, int]]:
     """
     Parse date from Legistar format (e.g., "11/6/2025", "1/7/2025").
@@ -54,15 +81,10 @@ def parse_legistar_date(date_text: str) -> Optional[Tuple[int, int, int]]:
     date_text = date_text.strip()
     
     # Try M/D/YYYY or MM/DD/YYYY format
-    match = re.match(r'(\d{1,2})/(\d{1,2})/(\d{4})', date_text)
+    match = _LEGISTAR_DATE.match(date_text)
     if match:
         month, day, year = map(int, match.groups())
-        try:
-            # Validate date
-            datetime(year, month, day)
-            return (year, month, day)
-        except ValueError:
-            return None
+        return (year, month, day) if is_valid_date(year, month, day) else None
     
     return None
 
@@ -78,25 +100,25 @@ def extract_meeting_rows(html: str, config: dict, base_url: str) -> list:
         - parsed_date: Tuple (year, month, day) or None
         - minutes_url: URL to minutes PDF (or None)
     """
-    soup = BeautifulSoup(html, 'lxml')
+    root = parse_html(html)
     
     # Find table with Minutes links
-    minutes_links = soup.find_all('a', href=lambda x: x and 'View.ashx?M=M' in x)
+    minutes_links = _MINUTES_LINKS(root)
     if not minutes_links:
         return []
     
     # Get parent table
-    table = minutes_links[0].find_parent('table')
-    if not table:
+    table = next(minutes_links[0].iterancestors('table'), None)
+    if table is None:
         return []
     
-    rows = table.find_all('tr')
+    rows = list(table.iter('tr'))
     if len(rows) < 2:
         return []
     
     # Parse header row to find column indices
     header_row = rows[0]
-    headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
+    headers = [text_of(th) for th in header_row.iter('th', 'td')]
     
     # Find column indices (handle different header formats)
     name_idx = None
@@ -116,8 +138,8 @@ def extract_meeting_rows(html: str, config: dict, base_url: str) -> list:
     if date_idx is None:
         # Check if first column looks like a date
         if len(rows) > 1:
-            first_data_cell = rows[1].find_all(['td', 'th'])[0].get_text(strip=True)
-            if re.match(r'\d{1,2}/\d{1,2}/\d{4}', first_data_cell):
+            first_data_cell = text_of(list(rows[1].iter('td', 'th'))[0])
+            if _LEGISTAR_DATE.match(first_data_cell):
                 date_idx = 0
             else:
                 date_idx = 1
@@ -140,15 +162,15 @@ def extract_meeting_rows(html: str, config: dict, base_url: str) -> list:
     
     # Process data rows
     for row in rows[1:]:
-        cells = row.find_all(['td', 'th'])
+        cells = list(row.iter('td', 'th'))
         if len(cells) <= max(name_idx, date_idx, minutes_idx):
             continue
         
         # Extract meeting name
-        name = cells[name_idx].get_text(strip=True) if name_idx < len(cells) else ""
+        name = text_of(cells[name_idx]) if name_idx < len(cells) else ""
         
         # If name is just a date (Olathe-style), use a default name
-        if re.match(r'^\d{1,2}/\d{1,2}/\d{4}$', name):
+        if _DATE_ONLY.match(name):
             name = config.get('default_meeting_name', 'City Council')
         
         # Apply filter if specified
@@ -157,16 +179,16 @@ def extract_meeting_rows(html: str, config: dict, base_url: str) -> list:
                 continue
         
         # Extract date
-        date_text = cells[date_idx].get_text(strip=True) if date_idx < len(cells) else ""
+        date_text = text_of(cells[date_idx]) if date_idx < len(cells) else ""
         parsed_date = parse_legistar_date(date_text)
         
         # Extract minutes link
         minutes_url = None
         minutes_cell = cells[minutes_idx] if minutes_idx < len(cells) else None
-        if minutes_cell:
-            minutes_link = minutes_cell.find('a', href=lambda x: x and 'View.ashx?M=M' in x)
+        if minutes_cell is not None:
+            minutes_link = _CELL_MINUTES_LINK(minutes_cell)
             if minutes_link:
-                href = minutes_link.get('href', '')
+                href = minutes_link[0].get('href', '')
                 minutes_url = urljoin(base_url, href)
         
         # Only include if we have a minutes URL
@@ -216,7 +238,7 @@ def download_and_save(
             return result
         
         # Download
-        content_bytes, content_type = download_url(url)
+        content_bytes, content_type = download_url(url, session=SESSION)
         
         # Check if PDF
         if not is_pdf_content(content_type, content_bytes):
@@ -237,7 +259,7 @@ def download_and_save(
         # Always save file to disk if it doesn't exist
         date_str = f"{month:02d}-{day:02d}-{year}"
         # Sanitize meeting name for filename
-        safe_name = "".join(ch for ch in meeting_name if ch.isalnum() or ch in (" ", "_", "-", ".")).rstrip()
+        safe_name = sanitize_filename(meeting_name)
         safe_name = safe_name.replace(" ", "_")[:50]  # Limit length
         filename = f"{city_name}_{date_str}_{safe_name}_Minutes.pdf"
         
@@ -508,11 +530,7 @@ def main():
                 driver.quit()
         else:
             # Fallback to requests (limited to first page)
-            session = requests.Session()
-            session.headers.update({
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-            })
-            resp = session.get(page_url, timeout=30)
+            resp = SESSION.get(page_url, timeout=30)
             resp.raise_for_status()
             html = resp.text
             print("Warning: Using requests (no Selenium). May only get first page of results.", file=sys.stderr)
@@ -4,6 +4,8 @@ Local SQLite database utility for document storage and duplicate prevention.
 
 import hashlib
 import sqlite3
+import sys
+import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
@@ -38,6 +40,24 @@ def get_backend_path() -> Path:
 
 DEFAULT_DB_PATH = "data/civicpulse.db"
 
+# Cached listing-page bodies live in their own file, not next to documents
+DEFAULT_HTTP_CACHE_PATH = "data/http_cache.sqlite"
+
+# documents.content_hash is unique across every row ever stored, so all
+# writers must agree on this algorithm; it is the dedupe key, not a checksum
+# that can be swapped per row.
+CONTENT_HASH_ALGORITHM = "sha256"
+
+
+def content_hasher():
+    """
+    Return a new hash object for document content.
+
+    Same implementation as hashlib.sha256(); going through hashlib.new()
+    only keeps the algorithm name in CONTENT_HASH_ALGORITHM.
+    """
+    return hashlib.new(CONTENT_HASH_ALGORITHM)
+
 
 def get_db_path(db_path: str = None) -> Path:
     """Get the database path and ensure the directory exists."""
@@ -57,16 +77,17 @@ def get_db_path(db_path: str = None) -> Path:
     return db_file
 
 
-def init_db(db_path: str = None) -> None:
+def init_db(db_path: str = None, conn: sqlite3.Connection = None) -> None:
     """
     Initialize the database by running the schema.sql file.
     
     Args:
         db_path: Optional path to the database file (defaults to data/civicpulse.db)
+        conn: Optional open connection (e.g. to ":memory:") to initialize
+            instead of db_path; it is left open for the caller
     """
     backend_path = get_backend_path()
     schema_path = backend_path / "db" / "schema.sql"
-    db_file = get_db_path(db_path)
     
     if not schema_path.exists():
         raise FileNotFoundError(f"Schema file not found: {schema_path}")
@@ -76,12 +97,15 @@ def init_db(db_path: str = None) -> None:
         schema_sql = f.read()
     
     # Execute the schema
-    conn = sqlite3.connect(str(db_file))
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(str(get_db_path(db_path)))
     try:
         conn.executescript(schema_sql)
         conn.commit()
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
 
 def url_exists_in_db(file_url: str, db_path: str = None) -> bool:
@@ -109,7 +133,48 @@ def url_exists_in_db(file_url: str, db_path: str = None) -> bool:
         conn.close()
 
 
-def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: str = None) -> dict:
+# SQLite's default limit on host parameters per statement is 999
+_MAX_SQL_PARAMS = 900
+
+
+def find_existing_urls(file_urls: list, db_path: str = None) -> dict:
+    """
+    Look up many URLs at once (batch version of url_exists_in_db).
+    
+    Args:
+        file_urls: URLs to check
+        db_path: Optional path to the database file
+        
+    Returns:
+        Dict mapping each URL already in the database to its document ID
+    """
+    urls = list(dict.fromkeys(file_urls))
+    existing = {}
+    if not urls:
+        return existing
+    
+    db_file = get_db_path(db_path)
+    conn = sqlite3.connect(str(db_file))
+    
+    try:
+        cursor = conn.cursor()
+        for start in range(0, len(urls), _MAX_SQL_PARAMS):
+            batch = urls[start:start + _MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(batch))
+            cursor.execute(
+                f"SELECT file_url, id FROM documents WHERE file_url IN ({placeholders})",
+                batch
+            )
+            for file_url, document_id in cursor.fetchall():
+                existing.setdefault(file_url, document_id)
+    finally:
+        conn.close()
+    
+    return existing
+
+
+def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: str = None,
+                conn: sqlite3.Connection = None) -> dict:
     """
     Save a document to the database if it doesn't already exist (based on content hash).
     
@@ -117,6 +182,9 @@ def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: st
         source_id: The source identifier (e.g., "wichita_city_council")
         file_url: The URL where the document was found
         content_bytes: The raw content of the document
+        db_path: Optional path to the database file
+        conn: Optional open connection to use instead of db_path; the insert
+            joins the caller's transaction and the caller commits
         
     Returns:
         Dict with keys:
@@ -126,20 +194,65 @@ def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: st
             - bytes_size: Size of the content in bytes
     """
     # Compute SHA256 hash
-    content_hash = hashlib.sha256(content_bytes).hexdigest()
+    content_hash = hashlib.new(CONTENT_HASH_ALGORITHM, content_bytes).hexdigest()
+    
+    return save_if_new_by_hash(source_id, file_url, content_hash, len(content_bytes),
+                               db_path=db_path, conn=conn)
+
+
+def hash_file(file_path, buffer_size: int = 1024 * 1024) -> tuple:
+    """
+    Hash a file on disk without reading it into memory.
+    
+    One buffer is reused for every read (readinto), so hashing a large PDF
+    allocates buffer_size bytes once rather than the whole file.
+    
+    Returns:
+        Tuple of (SHA256 hex digest, size in bytes)
+    """
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: the same readinto loop, run inside hashlib
+        with open(file_path, "rb", buffering=0) as f:
+            digest = hashlib.file_digest(f, CONTENT_HASH_ALGORITHM)
+            return digest.hexdigest(), f.tell()
+    
+    hasher = content_hasher()
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    size = 0
+    with open(file_path, "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            hasher.update(view[:n])
+            size += n
+    return hasher.hexdigest(), size
+
+
+def save_if_new_by_hash(source_id: str, file_url: str, content_hash: str, bytes_size: int,
+                        db_path: str = None, conn: sqlite3.Connection = None) -> dict:
+    """
+    Same as save_if_new, for content that was hashed while streaming to disk.
     
+    Args:
+        source_id: The source identifier (e.g., "wichita_city_council")
+        file_url: The URL where the document was found
+        content_hash: SHA256 hex digest of the content
+        bytes_size: Size of the content in bytes
+        db_path: Optional path to the database file
+        conn: Optional open connection, as for save_if_new
+        
+    Returns:
+        Same dict as save_if_new
+    """
     # Generate unique ID
     document_id = str(uuid.uuid4())
     
     # Get UTC ISO timestamp
     created_at = datetime.now(timezone.utc).isoformat()
     
-    # Get bytes size
-    bytes_size = len(content_bytes)
-    
     # Try to insert
-    db_file = get_db_path(db_path)
-    conn = sqlite3.connect(str(db_file))
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(str(get_db_path(db_path)))
     
     try:
         cursor = conn.cursor()
@@ -151,11 +264,14 @@ def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: st
                 """,
                 (document_id, source_id, file_url, content_hash, bytes_size, created_at)
             )
-            conn.commit()
+            if own_conn:
+                conn.commit()
             status = "created"
         except sqlite3.IntegrityError:
-            # Duplicate content_hash detected
-            conn.rollback()
+            # Duplicate content_hash detected. Only the failed statement is
+            # undone, so a caller's transaction keeps its earlier inserts.
+            if own_conn:
+                conn.rollback()
             status = "duplicate"
             
             # Get the existing document's ID
@@ -168,7 +284,8 @@ def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: st
                 document_id = result[0]
     
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
     
     return {
         "status": status,
@@ -178,6 +295,220 @@ def save_if_new(source_id: str, file_url: str, content_bytes: bytes, db_path: st
     }
 
 
+def save_many_by_hash(rows: list, db_path: str = None) -> list:
+    """
+    Batch version of save_if_new_by_hash: insert many documents in one transaction.
+    
+    Args:
+        rows: List of (source_id, file_url, content_hash, bytes_size) tuples
+        db_path: Optional path to the database file
+        
+    Returns:
+        List of result dicts (same keys as save_if_new), in the order of rows.
+        Rows repeating a content hash already stored, or seen earlier in the
+        same batch, are reported as "duplicate" with the existing document ID.
+    """
+    if not rows:
+        return []
+    
+    created_at = datetime.now(timezone.utc).isoformat()
+    db_file = get_db_path(db_path)
+    conn = sqlite3.connect(str(db_file))
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Hashes already in the database
+        known = {}
+        hashes = list(dict.fromkeys(row[2] for row in rows))
+        for start in range(0, len(hashes), _MAX_SQL_PARAMS):
+            batch = hashes[start:start + _MAX_SQL_PARAMS]
+            placeholders = ",".join("?" * len(batch))
+            cursor.execute(
+                f"SELECT content_hash, id FROM documents WHERE content_hash IN ({placeholders})",
+                batch
+            )
+            for content_hash, document_id in cursor.fetchall():
+                known.setdefault(content_hash, document_id)
+        
+        results = []
+        inserts = []
+        for source_id, file_url, content_hash, bytes_size in rows:
+            if content_hash in known:
+                status, document_id = "duplicate", known[content_hash]
+            else:
+                status, document_id = "created", str(uuid.uuid4())
+                known[content_hash] = document_id
+                inserts.append((document_id, source_id, file_url, content_hash, bytes_size, created_at))
+            results.append({
+                "status": status,
+                "document_id": document_id,
+                "content_hash": content_hash,
+                "bytes_size": bytes_size
+            })
+        
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO documents (id, source_id, file_url, content_hash, bytes_size, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            inserts
+        )
+        conn.commit()
+        
+        # Rows ignored by another constraint (or a concurrent writer) were not created
+        if cursor.rowcount != len(inserts):
+            new_ids = [row[0] for row in inserts]
+            stored = set()
+            for start in range(0, len(new_ids), _MAX_SQL_PARAMS):
+                batch = new_ids[start:start + _MAX_SQL_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                cursor.execute(f"SELECT id FROM documents WHERE id IN ({placeholders})", batch)
+                stored.update(r[0] for r in cursor.fetchall())
+            for result in results:
+                if result["status"] == "created" and result["document_id"] not in stored:
+                    result["status"] = "duplicate"
+                    cursor.execute(
+                        "SELECT id FROM documents WHERE content_hash = ? LIMIT 1",
+                        (result["content_hash"],)
+                    )
+                    row = cursor.fetchone()
+                    result["document_id"] = row[0] if row else None
+    finally:
+        conn.close()
+    
+    return results
+
+
+class DocumentBatch:
+    """
+    Buffers document rows and writes them with save_many_by_hash.
+    
+    Scrapers add one row per downloaded PDF; rows are committed every
+    batch_size additions and on flush(), instead of one transaction per PDF.
+    Each add() takes the caller's result dict, whose "status" and
+    "document_id" are filled in when the row is written; if the write fails,
+    status becomes "error" with the reason. Safe to call from worker threads.
+    """
+    
+    def __init__(self, db_path: str = None, batch_size: int = 32):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+    
+    def add(self, source_id: str, file_url: str, content_hash: str, bytes_size: int, result: dict) -> None:
+        result["status"] = "pending"
+        with self._lock:
+            self._pending.append(((source_id, file_url, content_hash, bytes_size), result))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+    
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self) -> None:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            saved = save_many_by_hash([row for row, _result in pending], db_path=self.db_path)
+        except Exception as e:
+            # Report the rows as failed instead of leaving them "pending"
+            # and raising out of whichever worker's add() hit the limit
+            print(f"Warning: could not save {len(pending)} document rows: {e}", file=sys.stderr)
+            for _row, result in pending:
+                result["status"] = "error"
+                result["reason"] = f"Database write failed: {e}"
+            return
+        for (_row, result), db_result in zip(pending, saved):
+            result["status"] = db_result["status"]
+            result["document_id"] = db_result["document_id"]
+
+
+# Layout of the http_cache table, stored in the cache file's user_version
+_HTTP_CACHE_SCHEMA_VERSION = 1
+
+
+def _ensure_http_cache(conn: sqlite3.Connection) -> None:
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _HTTP_CACHE_SCHEMA_VERSION:
+        # Earlier caches held bodies already decoded as UTF-8; refetch them
+        conn.execute("DROP TABLE IF EXISTS http_cache")
+        conn.execute(f"PRAGMA user_version = {_HTTP_CACHE_SCHEMA_VERSION}")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content BLOB NOT NULL,
+            encoding TEXT NOT NULL,
+            fetched_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def get_cached_page(url: str, cache_path: str = None):
+    """
+    Return the cached validators and body for a page fetched earlier.
+    
+    Args:
+        url: The page URL
+        cache_path: Optional path to the page cache file
+        
+    Returns:
+        Dict with keys etag, last_modified, content (raw bytes), encoding;
+        or None if not cached
+    """
+    cache_file = get_db_path(cache_path or DEFAULT_HTTP_CACHE_PATH)
+    if not cache_file.exists():
+        return None
+    conn = sqlite3.connect(str(cache_file))
+    
+    try:
+        _ensure_http_cache(conn)
+        row = conn.execute(
+            "SELECT etag, last_modified, content, encoding FROM http_cache WHERE url = ?",
+            (url,)
+        ).fetchone()
+    finally:
+        conn.close()
+    
+    if row is None:
+        return None
+    return {"etag": row[0], "last_modified": row[1], "content": row[2], "encoding": row[3]}
+
+
+def store_cached_page(url: str, etag: str, last_modified: str, content: bytes, encoding: str,
+                      cache_path: str = None) -> None:
+    """
+    Remember a page body with its ETag / Last-Modified validators for conditional GETs.
+    
+    Args:
+        url: The page URL
+        etag: ETag response header (or None)
+        last_modified: Last-Modified response header (or None)
+        content: Raw page body
+        encoding: Encoding to decode content with
+        cache_path: Optional path to the page cache file
+    """
+    cache_file = get_db_path(cache_path or DEFAULT_HTTP_CACHE_PATH)
+    conn = sqlite3.connect(str(cache_file))
+    
+    try:
+        _ensure_http_cache(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, content, encoding, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content, encoding, datetime.now(timezone.utc).isoformat())
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
 if __name__ == "__main__":
     # Example usage and test
     print("Initializing database...")
@@ -4,19 +4,35 @@ Single URL scraper that downloads, validates, and stores one PDF file.
 """
 
 import argparse
+import io
 import json
+import os
+import shutil
 import sys
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 # Add this module's parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 # Import existing helpers
 from config_loader import load_config
-from local_db import init_db, save_if_new
+from local_db import content_hasher, get_cached_page, init_db, save_if_new_by_hash, store_cached_page
+
+
+# Read/hash granularity for downloads. Large chunks keep the per-chunk Python
+# overhead negligible, and hashlib releases the GIL while hashing buffers this
+# size, so concurrent download workers hash in parallel.
+CHUNK_SIZE = 64 * 1024
 
 
 def is_allowed_domain(host: str, allowed_domains: list) -> bool:
@@ -36,44 +52,57 @@ def is_allowed_domain(host: str, allowed_domains: list) -> bool:
         - Validates domain format (rejects malformed domains)
         - Ensures base domain has proper structure (at least 2 parts for TLD)
     """
-    host = host.lower()
+    # Crawls check the same few hosts against the same list over and over
+    return _host_allowed(host.lower(), tuple(allowed_domains))
+
+
+def are_allowed_domains(hosts, allowed_domains: list) -> list:
+    """
+    Bulk form of is_allowed_domain(): one bool per host, in order.
     
+    The allowed list is converted once for the whole batch rather than once
+    per host, and repeated hosts are answered from the cache.
+    """
+    allowed = tuple(allowed_domains)
+    return [_host_allowed(host.lower(), allowed) for host in hosts]
+
+
+@lru_cache(maxsize=4096)
+def _host_allowed(host: str, allowed_domains: tuple) -> bool:
+    """Cached body of is_allowed_domain(); host must already be lowercased."""
     # Quick validation: reject empty or malformed domains
     if not host or not host.replace(".", "").replace("-", "").isalnum():
         return False
     
-    # Validate base domain structure - must have at least 2 parts (name + TLD)
-    for allowed in allowed_domains:
-        allowed = allowed.lower()
-        allowed_parts = allowed.split(".")
-        
-        # Security: Reject if allowed domain is a bare TLD (e.g., "gov")
-        # This prevents "evil.gov" from matching when allowed_domains = ["gov"]
-        if len(allowed_parts) < 2:
-            continue  # Skip invalid allowed domain
-        
-        # Exact match
-        if host == allowed:
-            return True
-        
-        # For subdomain matches, verify proper domain structure
-        if host.endswith("." + allowed):
-            host_parts = host.split(".")
-            
-            # Host must have more parts than allowed domain to be a valid subdomain
-            # Example: www.wichita.gov (3 parts) > wichita.gov (2 parts) ✓
-            if len(host_parts) > len(allowed_parts):
-                # Additional security: ensure the subdomain part exists and is valid
-                # Extract the subdomain part (everything before the base domain)
-                subdomain = ".".join(host_parts[:-len(allowed_parts)])
-                
-                # Subdomain should be non-empty and contain valid characters
-                if subdomain and all(part and part.replace("-", "").isalnum() for part in subdomain.split(".")):
-                    return True
+    # Look each of the host's label suffixes up in the allowed set instead of
+    # scanning the allowed list: "www.wichita.gov" tries "www.wichita.gov",
+    # "wichita.gov" and "gov"
+    allowed = _allowed_suffixes(allowed_domains)
+    labels = host.split(".")
+    for i in range(len(labels)):
+        if ".".join(labels[i:]) in allowed:
+            # Exact match, or a subdomain whose labels are all valid
+            # (e.g. not "a..wichita.gov" or "-.wichita.gov")
+            if all(label.replace("-", "").isalnum() for label in labels[:i]):
+                return True
     
     return False
 
 
+@lru_cache(maxsize=64)
+def _allowed_suffixes(allowed_domains: tuple) -> frozenset:
+    """
+    Lowercased allowed domains, keeping only those with proper structure.
+    
+    Security: bare TLDs (e.g. "gov") are dropped so "evil.gov" cannot match
+    when allowed_domains = ["gov"].
+    """
+    return frozenset(
+        allowed.lower() for allowed in allowed_domains
+        if len(allowed.split(".")) >= 2
+    )
+
+
 def is_pdf_content(content_type: str, content_bytes: bytes) -> bool:
     """
     Check if the content is actually a PDF.
@@ -96,7 +125,7 @@ def is_pdf_content(content_type: str, content_bytes: bytes) -> bool:
     return False
 
 
-def download_url(url: str, timeout: int = 20, max_size: int = 100 * 1024 * 1024) -> tuple:
+def download_url(url: str, timeout: int = 20, max_size: int = 100 * 1024 * 1024, session=None) -> tuple:
     """
     Download content from a URL with size limit protection.
     
@@ -104,6 +133,8 @@ def download_url(url: str, timeout: int = 20, max_size: int = 100 * 1024 * 1024)
         url: URL to download
         timeout: Timeout in seconds
         max_size: Maximum allowed file size in bytes (default 100MB)
+        session: Optional requests.Session; when given, the download reuses its
+            pooled keep-alive connections instead of opening a new one
         
     Returns:
         Tuple of (bytes, content_type_header_value)
@@ -112,37 +143,251 @@ def download_url(url: str, timeout: int = 20, max_size: int = 100 * 1024 * 1024)
         ValueError: If file size exceeds max_size
         Exception on network or download errors
     """
+    sink = _DownloadSink(io.BytesIO(), max_size)
+    with _open_stream(url, session, timeout) as (content_type, body):
+        shutil.copyfileobj(body, sink, CHUNK_SIZE)
+    
+    return sink.out.getvalue(), content_type
+
+
+@contextmanager
+def _open_stream(url: str, session, timeout: int):
+    """
+    Open a streaming GET and yield (content_type, readable body).
+    
+    Uses the session's pooled connections when one is given, else urllib.
+    The body is a file-like object, so it can be drained with
+    shutil.copyfileobj rather than a per-chunk Python loop.
+    """
+    if session is not None:
+        with session.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            # Undo any gzip/deflate transfer encoding, as iter_content would
+            response.raw.decode_content = True
+            yield response.headers.get("Content-Type", ""), response.raw
+        return
+    
     req = Request(url)
     req.add_header("User-Agent", "CivicPulse/1.0")
     
     with urlopen(req, timeout=timeout) as response:
-        content_type = response.headers.get("Content-Type", "")
-        
-        # Read content in chunks to avoid memory exhaustion and enforce size limits
-        chunks = []
-        total_size = 0
-        chunk_size = 8192  # 8KB chunks
+        yield response.headers.get("Content-Type", ""), response
+
+
+class _DownloadSink:
+    """
+    File-like target for shutil.copyfileobj that enforces max_size and
+    optionally hashes what passes through before writing it to out.
+    """
+    
+    def __init__(self, out, max_size: int, hasher=None):
+        self.out = out
+        self.max_size = max_size
+        self.hasher = hasher
+        self.size = 0
+    
+    def write(self, data) -> int:
+        self.size += len(data)
+        # Check size limit before writing to prevent DoS
+        _check_size(self.size, self.max_size)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        return self.out.write(data)
+
+
+def _check_size(total_size: int, max_size: int) -> None:
+    if total_size > max_size:
+        raise ValueError(
+            f"File size ({total_size} bytes) exceeds maximum allowed size ({max_size} bytes). "
+            f"This may be a denial-of-service attempt."
+        )
+
+
+HEAD_BYTES = 1024
+
+
+def download_to_file(url: str, dest_dir, session=None, timeout: int = 60,
+                     max_size: int = 100 * 1024 * 1024, accept=None) -> dict:
+    """
+    Stream a URL into a temporary file in dest_dir, hashing it in flight.
+    
+    Memory use stays at one chunk regardless of the PDF size. The caller
+    owns the temporary file: move it into place or delete it.
+    
+    Args:
+        url: URL to download
+        dest_dir: Directory for the temporary file (same filesystem as the
+            final location, so it can be renamed into place)
+        session: Optional requests.Session used for the download (urllib
+            is used without one)
+        timeout: Timeout in seconds
+        max_size: Maximum allowed file size in bytes (default 100MB)
+        accept: Optional callable(content_type, head) -> bool. It is called
+            once the first HEAD_BYTES have arrived; if it returns False the
+            transfer is abandoned there, so an HTML error page or login
+            redirect costs HEAD_BYTES instead of the whole body
         
-        while True:
-            chunk = response.read(chunk_size)
-            if not chunk:
-                break
-            
-            total_size += len(chunk)
-            
-            # Check size limit before accumulating to prevent DoS
-            if total_size > max_size:
-                raise ValueError(
-                    f"File size ({total_size} bytes) exceeds maximum allowed size ({max_size} bytes). "
-                    f"This may be a denial-of-service attempt."
-                )
-            
-            chunks.append(chunk)
+    Returns:
+        Dict with keys:
+            - path: Path of the temporary file (str)
+            - content_hash: SHA256 hex digest of the content
+            - bytes_size: Size of the content in bytes
+            - content_type: Content-Type header value
+            - head: First bytes of the content (for magic-byte checks)
+            - accepted: False if accept rejected the response (the file,
+              hash and size then cover only the bytes read so far)
         
-        # Combine all chunks into single byte string
-        content_bytes = b"".join(chunks)
+    Raises:
+        ValueError: If file size exceeds max_size
+        Exception on network or download errors (the temporary file is removed)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=str(dest_dir), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb", buffering=128 * 1024) as out, \
+                _open_stream(url, session, timeout) as (content_type, body):
+            sink = _DownloadSink(out, max_size, content_hasher())
+            head = body.read(HEAD_BYTES)
+            sink.write(head)
+            accepted = accept is None or accept(content_type, head)
+            if accepted:
+                shutil.copyfileobj(body, sink, CHUNK_SIZE)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    
+    return {
+        "path": tmp_path,
+        "content_hash": sink.hasher.hexdigest(),
+        "bytes_size": sink.size,
+        "content_type": content_type,
+        "head": head,
+        "accepted": accepted,
+    }
+
+
+def create_session(headers: dict = None) -> requests.Session:
+    """
+    Create a requests.Session for scraping.
+    
+    Connections are pooled (enough sockets for concurrent downloads) and
+    transient failures (connection resets, 429 and 5xx responses) are retried
+    with exponential backoff instead of failing the file outright.
+    """
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def _response_encoding(response) -> str:
+    """
+    The encoding to decode an HTML response with: the Content-Type charset
+    when the server sends one, otherwise the one detected from the body.
+    requests' own default for text/html without a charset is ISO-8859-1,
+    which garbles UTF-8 pages.
+    """
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        return response.encoding
+    return response.apparent_encoding or "utf-8"
+
+
+def _decode(content: bytes, encoding: str) -> str:
+    try:
+        return content.decode(encoding, errors="replace")
+    except LookupError:
+        # Unknown charset name in the header
+        return content.decode("utf-8", errors="replace")
+
+
+def fetch_html_conditional(session, url: str, timeout: int = 30, update_cache: bool = True) -> str:
+    """
+    GET an HTML page, revalidating a previously cached copy when possible.
+    
+    Sends If-None-Match / If-Modified-Since from the local page cache
+    (data/http_cache.sqlite); on 304 Not Modified the cached body is
+    returned without re-downloading. Pages served without validators are
+    fetched normally and not cached. With update_cache=False (dry runs) the
+    cache is only read, never written. The raw body is cached with its
+    encoding (see _response_encoding), so both paths decode it the same way.
+    
+    Raises:
+        requests.HTTPError on error responses
+    """
+    cached = get_cached_page(url)
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
     
-    return content_bytes, content_type
+    response = session.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 304 and cached:
+        return _decode(cached["content"], cached["encoding"])
+    response.raise_for_status()
+    
+    encoding = _response_encoding(response)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if update_cache and (etag or last_modified):
+        store_cached_page(url, etag, last_modified, response.content, encoding)
+    return _decode(response.content, encoding)
+
+
+class _SafeFilenameChars(dict):
+    """
+    str.translate table keeping alphanumerics and " _-." and dropping the rest.
+    
+    Entries are filled in on first sight of each code point (unicode letters
+    and digits included), so repeated titles translate entirely in C.
+    """
+    
+    def __missing__(self, codepoint: int):
+        ch = chr(codepoint)
+        keep = ch.isalnum() or ch in (" ", "_", "-", ".")
+        self[codepoint] = codepoint if keep else None
+        return self[codepoint]
+
+
+_SAFE_FILENAME_TABLE = _SafeFilenameChars()
+
+
+def sanitize_filename(title: str) -> str:
+    """Drop characters that are unsafe in filenames (keeps alphanumerics and " _-.")."""
+    return title.translate(_SAFE_FILENAME_TABLE).rstrip()
+
+
+def move_into_place(tmp_path, out_path) -> bool:
+    """
+    Atomically publish a finished temp file at out_path unless it already exists.
+    
+    A hard link fails with FileExistsError instead of overwriting, so no
+    separate exists() check is needed and readers never see a partial file.
+    The temp file is left for the caller to remove.
+    
+    Returns:
+        True if out_path was created, False if it already existed
+    """
+    try:
+        os.link(tmp_path, out_path)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        # Filesystems without hard links: fall back to check-then-rename
+        if os.path.exists(out_path):
+            return False
+        os.replace(tmp_path, out_path)
+        return True
 
 
 def get_backend_path() -> Path:
@@ -212,49 +457,55 @@ def main():
             print(json.dumps(result))
             sys.exit(1)
         
-        # Download
-        content_bytes, content_type = download_url(args.url)
+        # Output directory relative to backend; it is only created once a
+        # file is written, so duplicates and failures leave nothing behind
+        outdir = backend_path / args.outdir / args.source_id
         
-        # Check if PDF
-        if not is_pdf_content(content_type, content_bytes):
-            result["reason"] = "not a PDF"
-            print(json.dumps(result))
-            sys.exit(1)
-        
-        # Store in database
-        db_result = save_if_new(
-            source_id=args.source_id,
-            file_url=args.url,
-            content_bytes=content_bytes
-        )
-        
-        result["status"] = db_result["status"]
-        result["document_id"] = db_result["document_id"]
-        result["bytes"] = len(content_bytes)
-        
-        # Save file if new
-        if db_result["status"] == "created":
-            # Determine filename
-            if args.filename:
-                filename = args.filename
-            else:
-                filename = Path(urlparse(args.url).path).name or "document.pdf"
-            
-            # Generate timestamped filename
-            now = datetime.now(timezone.utc)
-            timestamp = now.strftime("%Y-%m-%d_%H%M%S")
-            timestamped_filename = f"{timestamp}_{filename}"
+        # Download, hashing in flight; non-PDF responses stop after the first
+        # chunk. The temp file goes in backend/data (created with the DB).
+        download = download_to_file(args.url, db_path.parent, timeout=20, accept=is_pdf_content)
+        tmp_path = download["path"]
+        try:
+            # Check if PDF
+            if not download["accepted"]:
+                result["reason"] = "not a PDF"
+                print(json.dumps(result))
+                sys.exit(1)
             
-            # Create output directory relative to backend
-            outdir = backend_path / args.outdir / args.source_id
-            outdir.mkdir(parents=True, exist_ok=True)
+            # Store in database
+            db_result = save_if_new_by_hash(
+                source_id=args.source_id,
+                file_url=args.url,
+                content_hash=download["content_hash"],
+                bytes_size=download["bytes_size"]
+            )
             
-            # Save file
-            saved_path = outdir / timestamped_filename
-            with open(saved_path, "wb") as f:
-                f.write(content_bytes)
+            result["status"] = db_result["status"]
+            result["document_id"] = db_result["document_id"]
+            result["bytes"] = download["bytes_size"]
             
-            result["saved_path"] = str(saved_path)
+            # Save file if new
+            if db_result["status"] == "created":
+                # Determine filename
+                if args.filename:
+                    filename = args.filename
+                else:
+                    filename = Path(urlparse(args.url).path).name or "document.pdf"
+                
+                # Generate timestamped filename
+                now = datetime.now(timezone.utc)
+                timestamp = now.strftime("%Y-%m-%d_%H%M%S")
+                timestamped_filename = f"{timestamp}_{filename}"
+                
+                # Save file (a rename unless outdir is on another filesystem)
+                outdir.mkdir(parents=True, exist_ok=True)
+                saved_path = outdir / timestamped_filename
+                shutil.move(tmp_path, saved_path)
+                
+                result["saved_path"] = str(saved_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
         
         # Print JSON result
         print(json.dumps(result))
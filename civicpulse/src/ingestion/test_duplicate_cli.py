@@ -10,7 +10,7 @@ from pathlib import Path
 # Add this module's parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from local_db import init_db, save_if_new, get_backend_path
+from local_db import init_db, hash_file, save_if_new_by_hash, get_backend_path
 
 
 def main():
@@ -32,23 +32,21 @@ def main():
         init_db()
         print("✓ Database initialized")
     
-    # Read the file as bytes
+    # Hash the file in fixed-size chunks rather than reading it whole
     file_path = Path(args.file_path)
     if not file_path.exists():
         print(f"Error: File not found: {args.file_path}")
         exit(1)
     
-    with open(file_path, 'rb') as f:
-        content_bytes = f.read()
-    
-    file_size = len(content_bytes)
+    content_hash, file_size = hash_file(file_path)
     print(f"Read {file_size} bytes from {args.file_path}")
     
     # Save the document
-    result = save_if_new(
+    result = save_if_new_by_hash(
         source_id=args.source_id,
         file_url=args.file_url,
-        content_bytes=content_bytes
+        content_hash=content_hash,
+        bytes_size=file_size
     )
     
     # Print the result
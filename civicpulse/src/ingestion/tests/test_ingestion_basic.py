@@ -26,9 +26,7 @@ class MockResponse:
     
     def __init__(self, content_bytes: bytes, headers: dict):
         self.content_bytes = content_bytes
-        self._headers = {}
-        for key, value in headers.items():
-            self._headers[key.lower()] = value
+        self._headers = {key.lower(): value for key, value in headers.items()}
         self.headers = self
         self._position = 0  # Track position for chunked reading
     
@@ -41,262 +39,199 @@ class MockResponse:
     
     def read(self, size=-1):
         """Support both full and chunked reading."""
-        if size == -1 or size is None:
+        start = self._position
+        if size is None or size < 0:
             # Return all remaining data
-            result = self.content_bytes[self._position:]
-            self._position = len(self.content_bytes)
-            return result
+            end = len(self.content_bytes)
         else:
             # Return chunk
-            start = self._position
-            end = min(self._position + size, len(self.content_bytes))
-            result = self.content_bytes[start:end]
-            self._position = end
-            return result
+            end = min(start + size, len(self.content_bytes))
+        self._position = end
+        return self.content_bytes[start:end]
     
     def get(self, key, default=None):
         return self._headers.get(key.lower(), default)
 
 
-@pytest.fixture
-def mock_schema(tmp_path):
+# From tests/ -> ingestion/ -> src/ -> civicpulse/ -> CIVIC-civic-pulse/ -> backend
+BACKEND_PATH = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
+
+# Every shipped source config must load and validate
+CONFIG_NAMES = ["wichita_city_council.yaml"]
+
+# A minimal valid config; validation tests drop fields from a copy
+BASE_CONFIG = {
+    "id": "test_source",
+    "allowed_domains": ["test.gov"],
+    "start_urls": ["https://test.gov"],
+    "expected_formats": ["pdf"],
+    "frequency": {"cron": "0 9 * * 2"},
+    "follow_links": {"within_domains": True, "max_depth": 2},
+    "date_selection": {
+        "basis": "nearest_tuesday",
+        "offset_days": -14,
+        "match_format": "MMMM d, yyyy",
+    },
+    "selectors": {
+        "listing_page": "https://test.gov",
+        "link_selector": "a",
+        "pdf_selector": "a[href$='.pdf']",
+        "link_text_regex": "test",
+    },
+    "naming": {"filename_template": "{source_id}/{date}_{orig_name}"},
+    "flags": {"auth_required": False, "robots_respect": True},
+}
+
+
+@pytest.fixture(scope="session")
+def backend_cwd():
+    """Run the session from the backend directory so relative paths work."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(BACKEND_PATH)
+        yield BACKEND_PATH
+
+
+@pytest.fixture(scope="session", params=CONFIG_NAMES)
+def config_name(request):
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def config(backend_cwd, config_name):
+    """Each source config, loaded and validated once per session."""
+    from config_loader import load_config
+    return load_config(config_name)
+
+
+@pytest.fixture(scope="session")
+def wichita_config(backend_cwd):
+    from config_loader import load_config
+    return load_config("wichita_city_council.yaml")
+
+
+@pytest.fixture(scope="session")
+def mock_schema():
     """Ensure schema.json is accessible."""
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    schema_path = backend_path / "configs" / "schema.json"
+    schema_path = BACKEND_PATH / "configs" / "schema.json"
     return schema_path
 
 
-def test_config_validation_happy_path(mock_schema):
+def test_config_validation_happy_path(mock_schema, config, config_name):
     """Test loading and validating a valid config file."""
+    assert "id" in config
+    assert "start_urls" in config
+    assert "allowed_domains" in config
+    assert "expected_formats" in config
+    assert config["id"] == Path(config_name).stem
+    assert isinstance(config["start_urls"], list)
+    assert isinstance(config["allowed_domains"], list)
+    assert isinstance(config["expected_formats"], list)
+
+
+@pytest.mark.parametrize("drop", ["id", "start_urls", "allowed_domains"])
+def test_config_validation_failure(tmp_path, backend_cwd, drop):
+    """Test validation failure with a missing required field."""
+    import yaml
     from config_loader import load_config
     
-    # Change to backend directory so relative paths work
-    # From tests/ -> ingestion/ -> src/ -> civicpulse/ -> CIVIC-civic-pulse/ -> backend
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    original_cwd = Path.cwd()
+    # Create invalid YAML missing one required field
+    invalid_config = tmp_path / "invalid.yaml"
+    cfg = {k: v for k, v in BASE_CONFIG.items() if k != drop}
+    invalid_config.write_text(yaml.safe_dump(cfg))
     
-    try:
-        os.chdir(backend_path)
-        config = load_config("wichita_city_council.yaml")
-        
-        assert "id" in config
-        assert "start_urls" in config
-        assert "allowed_domains" in config
-        assert "expected_formats" in config
-        assert config["id"] == "wichita_city_council"
-        assert isinstance(config["start_urls"], list)
-        assert isinstance(config["allowed_domains"], list)
-        assert isinstance(config["expected_formats"], list)
-    finally:
-        os.chdir(original_cwd)
-
-
-def test_config_validation_failure(tmp_path):
-    """Test validation failure with missing required field."""
-    from config_loader import load_config
-    
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    original_cwd = Path.cwd()
+    with pytest.raises(ValueError) as exc_info:
+        load_config(str(invalid_config))
     
-    try:
-        os.chdir(backend_path)
-        
-        # Create invalid YAML missing "id"
-        invalid_config = tmp_path / "invalid.yaml"
-        invalid_config.write_text("""allowed_domains:
-  - test.gov
-start_urls:
-  - https://test.gov
-expected_formats:
-  - pdf
-frequency:
-  cron: "0 9 * * 2"
-follow_links:
-  within_domains: true
-  max_depth: 2
-date_selection:
-  basis: nearest_tuesday
-  offset_days: -14
-  match_format: "MMMM d, yyyy"
-selectors:
-  listing_page: https://test.gov
-  link_selector: a
-  pdf_selector: a[href$='.pdf']
-  link_text_regex: test
-naming:
-  filename_template: "{source_id}/{date}_{orig_name}"
-flags:
-  auth_required: false
-  robots_respect: true
-""")
-        
-        with pytest.raises(ValueError) as exc_info:
-            load_config(str(invalid_config))
-        
-        assert "Missing required field: id" in str(exc_info.value) or "Missing required field" in str(exc_info.value)
-    finally:
-        os.chdir(original_cwd)
+    assert "Missing required field" in str(exc_info.value)
+    assert drop in str(exc_info.value)
 
 
-def test_target_date_calculation():
+def test_target_date_calculation(wichita_config):
     """Test compute_target_date for specific dates."""
     from datetime import date
-    from config_loader import load_config, compute_target_date
-    import os
+    from config_loader import compute_target_date
     
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    original_cwd = Path.cwd()
+    # October 28, 2025 is a Tuesday (weekday() == 1)
+    # Offset is -14 days
+    # So: Tuesday Oct 28 - 14 days = Tuesday Oct 14
+    test_date = date(2025, 10, 28)
+    result = compute_target_date(test_date, wichita_config)
+    assert result == "October 14, 2025"
     
-    try:
-        os.chdir(backend_path)
-        config = load_config("wichita_city_council.yaml")
-        
-        # October 28, 2025 is a Tuesday (weekday() == 1)
-        # Offset is -14 days
-        # So: Tuesday Oct 28 - 14 days = Tuesday Oct 14
-        test_date = date(2025, 10, 28)
-        result = compute_target_date(test_date, config)
-        assert result == "October 14, 2025"
-        
-        # October 29, 2025 is a Wednesday
-        # Should find Tuesday Oct 28, then -14 days = Oct 14
-        test_date2 = date(2025, 10, 29)
-        result2 = compute_target_date(test_date2, config)
-        assert result2 == "October 14, 2025"
-    finally:
-        os.chdir(original_cwd)
+    # October 29, 2025 is a Wednesday
+    # Should find Tuesday Oct 28, then -14 days = Oct 14
+    test_date2 = date(2025, 10, 29)
+    result2 = compute_target_date(test_date2, wichita_config)
+    assert result2 == "October 14, 2025"
 
 
-def test_duplicate_prevention_roundtrip(tmp_path):
+def test_duplicate_prevention_roundtrip(tmp_path, backend_cwd):
     """Test duplicate prevention with init_db and save_if_new."""
+    import sqlite3
     from local_db import init_db, save_if_new
-    import os
-    
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    original_cwd = Path.cwd()
-    
-    try:
-        os.chdir(backend_path)
-        
-        # Use temp DB
-        db_path = tmp_path / "test.db"
-        
-        # Initialize database with temp path
-        init_db(str(db_path))
-        
-        # Verify it was created
-        assert db_path.exists()
-        
-        # First save - should create
-        PDF1 = b"%PDF-1.4\nA"
-        result1 = save_if_new(
-            "wichita_city_council",
-            "https://example.com/a.pdf",
-            PDF1,
-            db_path=str(db_path)
-        )
-        assert result1["status"] == "created"
-        assert "document_id" in result1
-        assert "content_hash" in result1
-        document_id1 = result1["document_id"]
-        
-        # Second save with same bytes - should be duplicate
-        result2 = save_if_new(
-            "wichita_city_council",
-            "https://example.com/a.pdf",
-            PDF1,
-            db_path=str(db_path)
-        )
-        assert result2["status"] == "duplicate"
-        assert result2["document_id"] == document_id1
-        
-        # Third save with different bytes - should create
-        PDF2 = b"%PDF-1.4\nB"
-        result3 = save_if_new(
-            "wichita_city_council",
-            "https://example.com/a.pdf",  # same URL but different content
-            PDF2,
-            db_path=str(db_path)
-        )
-        assert result3["status"] == "created"
-        assert result3["document_id"] != document_id1
-    finally:
-        os.chdir(original_cwd)
-
-
-def test_single_link_scraper_mocked_network(tmp_path):
-    """Test single-link scraper with mocked network for valid PDF."""
-    from single_link_scraper import download_url, is_pdf_content, is_allowed_domain
-    from config_loader import load_config
-    import os
     
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    original_cwd = Path.cwd()
+    # Use temp DB
+    db_path = tmp_path / "test.db"
     
-    mock_content = b"%PDF-1.4\nHELLO"
-    mock_headers = {"Content-Type": "application/pdf"}
+    # Initialize database with temp path
+    init_db(str(db_path))
     
-    def mock_urlopen(req, timeout=None):
-        return MockResponse(mock_content, mock_headers)
+    # Verify it was created
+    assert db_path.exists()
     
+    PDF1 = b"%PDF-1.4\nA"
+    PDF2 = b"%PDF-1.4\nB"
+    conn = sqlite3.connect(str(db_path))
     try:
-        os.chdir(backend_path)
-        
-        # Mock the network call
-        with patch('single_link_scraper.urlopen', side_effect=mock_urlopen):
-            # Test downloading the URL
-            content_bytes, content_type = download_url("https://www.wichita.gov/test.pdf")
-            
-            # Verify PDF content detection
-            assert is_pdf_content(content_type, content_bytes)
-            
-            # Verify domain validation
-            config = load_config("wichita_city_council.yaml")
-            assert is_allowed_domain("www.wichita.gov", config["allowed_domains"])
-            
-            # Verify content was downloaded
-            assert len(content_bytes) > 0
-            assert content_bytes == mock_content
-            
+        # All three saves run in one transaction on one connection
+        with conn:
+            # First save - should create
+            result1 = save_if_new("wichita_city_council", "https://example.com/a.pdf", PDF1, conn=conn)
+            # Second save with same bytes - should be duplicate
+            result2 = save_if_new("wichita_city_council", "https://example.com/a.pdf", PDF1, conn=conn)
+            # Third save with different bytes (same URL) - should create
+            result3 = save_if_new("wichita_city_council", "https://example.com/a.pdf", PDF2, conn=conn)
+        (count,) = conn.execute("SELECT COUNT(*) FROM documents").fetchone()
     finally:
-        os.chdir(original_cwd)
-
-
-def test_single_link_scraper_rejects_non_pdf(tmp_path):
-    """Test single-link scraper rejects non-PDF content."""
+        conn.close()
+    
+    assert result1["status"] == "created"
+    assert "document_id" in result1
+    assert "content_hash" in result1
+    assert result2["status"] == "duplicate"
+    assert result2["document_id"] == result1["document_id"]
+    assert result3["status"] == "created"
+    assert result3["document_id"] != result1["document_id"]
+    assert count == 2
+
+
+@pytest.mark.parametrize("content,ctype,is_pdf_expected", [
+    (b"%PDF-1.4\nHELLO", "application/pdf", True),
+    (b"<!doctype html><html></html>", "text/html", False),
+], ids=["pdf", "html"])
+def test_single_link_scraper_mocked_network(content, ctype, is_pdf_expected, monkeypatch):
+    """Test single-link scraper with mocked network: PDFs pass, HTML is rejected."""
+    import single_link_scraper
     from single_link_scraper import download_url, is_pdf_content
-    import os
     
-    backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-    original_cwd = Path.cwd()
+    # Mock the network call
+    monkeypatch.setattr(single_link_scraper, "urlopen",
+                        lambda req, timeout=None: MockResponse(content, {"Content-Type": ctype}))
+    content_bytes, content_type = download_url("https://www.wichita.gov/test")
     
-    mock_content = b"<!doctype html><html></html>"
-    mock_headers = {"Content-Type": "text/html"}
+    # Verify PDF content detection
+    assert is_pdf_content(content_type, content_bytes) == is_pdf_expected
     
-    def mock_urlopen(req, timeout=None):
-        return MockResponse(mock_content, mock_headers)
+    # Verify content was downloaded, with its content type
+    assert content_bytes == content
+    assert ctype in content_type.lower()
+
+
+def test_single_link_scraper_allowed_domain(wichita_config):
+    """Test the single-link scraper accepts the configured city domain."""
+    from single_link_scraper import is_allowed_domain
     
-    try:
-        os.chdir(backend_path)
-        
-        # Mock the network call
-        with patch('single_link_scraper.urlopen', side_effect=mock_urlopen):
-            # Test downloading non-PDF content
-            content_bytes, content_type = download_url("https://www.wichita.gov/page.html")
-            
-            # Verify it's detected as non-PDF
-            is_pdf = is_pdf_content(content_type, content_bytes)
-            assert not is_pdf, "HTML content should be rejected as non-PDF"
-            
-            # Verify HTML content was downloaded
-            assert len(content_bytes) > 0
-            assert content_bytes == mock_content
-            
-            # Verify content type
-            assert "text/html" in content_type.lower()
-            
-    finally:
-        os.chdir(original_cwd)
+    assert is_allowed_domain("www.wichita.gov", wichita_config["allowed_domains"])
 
 
 if __name__ == "__main__":
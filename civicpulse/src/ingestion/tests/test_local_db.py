@@ -4,58 +4,64 @@ import sqlite3
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 # Add module directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import target module
+import local_db
 from local_db import init_db, save_if_new, get_db_path
 
 
 class TestLocalDB(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Run the schema once into an in-memory template; tests get copies
+        cls.template = sqlite3.connect(":memory:")
+        init_db(conn=cls.template)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.template.close()
+
     def setUp(self):
-        self.tmpdir = tempfile.TemporaryDirectory()
-        self.db_path = str(Path(self.tmpdir.name) / "civicpulse_test.db")
-        # Ensure schema exists by calling init_db with our custom path
-        init_db(db_path=self.db_path)
+        # A fresh in-memory database per test, copied from the template
+        self.conn = sqlite3.connect(":memory:")
+        self.template.backup(self.conn)
 
     def tearDown(self):
-        self.tmpdir.cleanup()
+        self.conn.close()
 
     def _count_documents(self):
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM documents")
-            (n,) = cur.fetchone()
-            return n
-        finally:
-            conn.close()
+        (n,) = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+        return n
 
     def test_get_db_path_creates_directory(self):
-        custom_dir = Path(self.tmpdir.name) / "nested" / "dir"
-        custom_db = custom_dir / "db.sqlite"
-        resolved = get_db_path(str(custom_db))
-        self.assertTrue(resolved.parent.exists(), "Expected parent directory to be created")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            custom_dir = Path(tmpdir) / "nested" / "dir"
+            custom_db = custom_dir / "db.sqlite"
+            resolved = get_db_path(str(custom_db))
+            self.assertTrue(resolved.parent.exists(), "Expected parent directory to be created")
 
     def test_save_if_new_inserts_and_deduplicates(self):
         content = b"same-bytes-content"
-        res1 = save_if_new(
-            source_id="test_source",
-            file_url="https://example.com/a.pdf",
-            content_bytes=content,
-            db_path=self.db_path,
-        )
+        # Both saves share one connection and commit together
+        with self.conn:
+            res1 = save_if_new(
+                source_id="test_source",
+                file_url="https://example.com/a.pdf",
+                content_bytes=content,
+                conn=self.conn,
+            )
+            # Duplicate insert with same content
+            res2 = save_if_new(
+                source_id="test_source",
+                file_url="https://example.com/b.pdf",
+                content_bytes=content,
+                conn=self.conn,
+            )
         self.assertEqual(res1["status"], "created")
-        self.assertEqual(self._count_documents(), 1)
-
-        # Duplicate insert with same content
-        res2 = save_if_new(
-            source_id="test_source",
-            file_url="https://example.com/b.pdf",
-            content_bytes=content,
-            db_path=self.db_path,
-        )
         self.assertEqual(res2["status"], "duplicate")
         self.assertEqual(self._count_documents(), 1)
         # Should return same document_id and hash
@@ -63,33 +69,35 @@ class TestLocalDB(unittest.TestCase):
         self.assertEqual(res1["document_id"], res2["document_id"]) 
 
     def test_save_if_new_respects_custom_db_path(self):
-        # Write to default DB path once to prove isolation
-        # Ensure default DB schema exists
-        init_db()
-        default_result = save_if_new(
-            source_id="default",
-            file_url="https://example.com/default.pdf",
-            content_bytes=b"default-content",
-        )
-        # Now insert into our temp DB and make sure it's independent
-        res = save_if_new(
-            source_id="isolated",
-            file_url="https://example.com/iso.pdf",
-            content_bytes=b"iso-content",
-            db_path=self.db_path,
-        )
-        self.assertEqual(res["status"], "created")
-        self.assertEqual(self._count_documents(), 1)
-
-        # Clean up default DB file if it was created
-        # From tests/ -> ingestion/ -> src/ -> civicpulse/ -> CIVIC-civic-pulse/ -> backend
-        backend_path = Path(__file__).resolve().parent.parent.parent.parent.parent / "backend"
-        default_db = backend_path / "data" / "civicpulse.db"
-        if default_db.exists():
+        # This test is about file paths, so it uses on-disk databases. The
+        # default DB points at a scratch file so the real one is untouched;
+        # patch.object restores it even if an assertion fails
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch.object(local_db, "DEFAULT_DB_PATH", str(Path(tmpdir) / "civicpulse.db")):
+            custom_db = str(Path(tmpdir) / "custom.db")
+            init_db(db_path=custom_db)
+            # Write to default DB path once to prove isolation
+            # Ensure default DB schema exists
+            init_db()
+            save_if_new(
+                source_id="default",
+                file_url="https://example.com/default.pdf",
+                content_bytes=b"default-content",
+            )
+            # Now insert into the custom DB and make sure it's independent
+            res = save_if_new(
+                source_id="isolated",
+                file_url="https://example.com/iso.pdf",
+                content_bytes=b"iso-content",
+                db_path=custom_db,
+            )
+            conn = sqlite3.connect(custom_db)
             try:
-                default_db.unlink()
-            except Exception:
-                pass
+                (n,) = conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+            finally:
+                conn.close()
+        self.assertEqual(res["status"], "created")
+        self.assertEqual(n, 1)
 
 
 if __name__ == "__main__":
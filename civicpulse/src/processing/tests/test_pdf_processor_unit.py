@@ -46,12 +46,15 @@ def install_fake_pymupdf_and_pytesseract():
         return (a, b)
     fake_pymupdf.Matrix = _fake_matrix
 
+    # 2 pages: one with native text, one requiring OCR. The fakes are
+    # stateless, so every open() can hand back the same document.
+    fake_doc = FakeDoc([
+        FakePage(0, text="Hello native text\nLine2"),
+        FakePage(1, text=""),
+    ])
+
     def fake_open(path):
-        # 2 pages: one with native text, one requiring OCR
-        return FakeDoc([
-            FakePage(0, text="Hello native text\nLine2"),
-            FakePage(1, text=""),
-        ])
+        return fake_doc
 
     fake_pymupdf.open = fake_open
 
@@ -73,7 +76,13 @@ def install_fake_pymupdf_and_pytesseract():
         return "OCR TEXT"
 
     def fake_image_to_data(img, output=None):
-        return {"conf": ["95", "-1", "88"]}
+        return {
+            "text": ["", "OCR", "TEXT"],
+            "block_num": [0, 1, 1],
+            "par_num": [0, 1, 1],
+            "line_num": [0, 1, 1],
+            "conf": ["-1", "95", "88"],
+        }
 
     fake_pytesseract.image_to_string = fake_image_to_string
     fake_pytesseract.image_to_data = fake_image_to_data
@@ -85,21 +94,44 @@ def install_fake_pymupdf_and_pytesseract():
     sys.modules.setdefault("pytesseract", fake_pytesseract)
 
 
+pp = None
+
+# Contents unused by our fakes
+SAMPLE_PDF_BYTES = b"%PDF-1.4 ..."
+
+
+def setUpModule():
+    # Install the fakes and import the module under test once for all tests
+    global pp
+    install_fake_pymupdf_and_pytesseract()
+    # Defer import until fakes are installed
+    import pdf_processor
+    # OCR through the faked pytesseract even if tesserocr is installed
+    pdf_processor.tesserocr = None
+    pp = pdf_processor
+    # Ensure no real image decoding occurs even if real PIL is present
+    import PIL.Image
+    PIL.Image.open = lambda *_args, **_kwargs: SimpleNamespace()
+
+
 class TestPdfProcessorUnit(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The input PDF is read-only, so one copy serves every test
+        cls.pdf_tmpdir = tempfile.TemporaryDirectory()
+        cls.pdf_dir = Path(cls.pdf_tmpdir.name) / "pdfs"
+        cls.pdf_dir.mkdir(parents=True, exist_ok=True)
+        (cls.pdf_dir / "sample.pdf").write_bytes(SAMPLE_PDF_BYTES)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pdf_tmpdir.cleanup()
+
     def setUp(self):
-        install_fake_pymupdf_and_pytesseract()
-        # Defer import until fakes are installed
-        import pdf_processor as pp
         self.pp = pp
-        # Ensure no real image decoding occurs even if real PIL is present
-        import PIL.Image
-        PIL.Image.open = lambda *_args, **_kwargs: SimpleNamespace()
+        # Outputs (and the extraction cache under logs/) stay per test
         self.tmpdir = tempfile.TemporaryDirectory()
-        self.pdf_dir = Path(self.tmpdir.name) / "pdfs"
         self.out_dir = Path(self.tmpdir.name) / "out"
-        self.pdf_dir.mkdir(parents=True, exist_ok=True)
-        # Create a dummy .pdf file path (contents unused by our fakes)
-        (self.pdf_dir / "sample.pdf").write_bytes(b"%PDF-1.4 ...")
 
     def tearDown(self):
         self.tmpdir.cleanup()
@@ -128,6 +160,38 @@ class TestPdfProcessorUnit(unittest.TestCase):
         summary_csv = self.out_dir / "logs" / "summary.csv"
         self.assertTrue(summary_csv.exists(), "Expected summary.csv to be created")
 
+    def test_extraction_cache_is_keyed_by_extractor(self):
+        self.pp.process_pdfs(self.pdf_dir, self.out_dir, keywords=[])
+        extract = self.pp._extract_and_count
+        with patch.object(self.pp, "_extract_and_count", side_effect=extract) as spy:
+            self.pp.process_pdfs(self.pdf_dir, self.out_dir, keywords=[])
+            self.assertEqual(spy.call_count, 0, "Expected the cached result to be reused")
+
+            # A different extractor must not reuse the earlier text
+            self.pp._extractor_id.cache_clear()
+            try:
+                with patch.object(self.pp, "EXTRACTOR_VERSION", self.pp.EXTRACTOR_VERSION + 1):
+                    self.pp.process_pdfs(self.pdf_dir, self.out_dir, keywords=[])
+            finally:
+                self.pp._extractor_id.cache_clear()
+            self.assertEqual(spy.call_count, 1)
+
+    def test_ocr_text_matches_image_to_string(self):
+        result = self.pp.extract_pdf(self.pdf_dir / "sample.pdf")
+        ocr_page = result["per_page"][1]
+        self.assertEqual(ocr_page["text"], "OCR TEXT")
+        self.assertEqual(ocr_page["ocr_avg_conf"], 91.5)
+
+    def test_ocr_falls_back_to_image_to_string_without_word_data(self):
+        def failing_image_to_data(img, output=None):
+            raise RuntimeError("no word boxes")
+
+        with patch.object(self.pp.pytesseract, "image_to_data", failing_image_to_data):
+            result = self.pp.extract_pdf(self.pdf_dir / "sample.pdf")
+        ocr_page = result["per_page"][1]
+        self.assertEqual(ocr_page["text"], "OCR TEXT")
+        self.assertIsNone(ocr_page["ocr_avg_conf"])
+
 
 if __name__ == "__main__":
     unittest.main()